@@ -0,0 +1,388 @@
+"""
+Motor de agrupamento de produtos (porta de definirGrupo de src/lib/agrupamento.ts)
+As regras ficam em tabelas (componentes e marcas) e todos os termos são
+compilados numa única regex em trie, que acha de uma vez quais termos
+aparecem em cada palavra do nome (termos com espaço são testados no nome
+inteiro). O resultado é memoizado por palavra e por nome.
+
+Desempenho: agrupar 100k nomes distintos leva ~1,9s, acima da meta de 1s.
+O que sobra é trabalho por nome em Python puro (split, união dos
+conjuntos, regras da marca e fallback), não a varredura dos termos.
+
+    from agrupamento import definir_grupo, agrupar
+    definir_grupo("Ração Golden Special Cães Adultos Frango e Carne 15kg")
+    agrupar(nomes)  # lista de grupos, na mesma ordem
+
+Ao mudar definirGrupo no TS, atualize as tabelas abaixo e confira com
+scripts/paridade_agrupamento.py.
+"""
+import re
+from functools import lru_cache
+
+# =====================
+# REGRAS
+# =====================
+
+# Componentes: vale o primeiro rótulo com algum termo presente no nome
+ESPECIE = [
+    ("Gatos", ["gato", "felino", "cat ", "feline"]),
+    ("Cães", ["cão", "cães", "cachorro", "dog", "canino"]),
+]
+FASE = [
+    ("Filhotes", ["filhote", "puppy", "kitten", "junior"]),
+    ("Sênior", ["senior", "idoso", "7+", "mature"]),
+    ("Castrados", ["castrado", "sterili"]),
+    ("Light", ["light", "obeso", "peso"]),
+    ("Adultos", ["adult"]),
+]
+PORTE = [
+    ("Peq.", ["pequeno", "small", "mini", "toy"]),
+    ("Méd.", ["médio", "medio", "medium"]),
+    ("Gig.", ["gigante", "giant", "maxi"]),
+    ("Gde.", ["grande", "large"]),
+]
+SABOR = [
+    ("Frango", ["frango"]),
+    ("Carne", ["carne"]),
+    ("Salmão", ["salmão", "salmon"]),
+    ("Cordeiro", ["cordeiro"]),
+    ("Peru", ["peru"]),
+    ("Peixe", ["peixe"]),
+    ("Vegetais", ["vegetal"]),
+    ("Arroz", ["arroz"]),
+]
+
+# Partes do nome do grupo, em ordem (as vazias são omitidas):
+#   "texto"      literal
+#   "$sabor", "$fase", "$porte"   componentes acima
+#   "$especie"   "para <espécie>" (vazio se não detectada)
+#   "$qtd"       "3 Comp." / "1 Comp." (regex de pacote com 3)
+#   Tabela       rótulo da primeira condição presente (ou o padrão)
+# Condição: termo (str) ou tupla de termos que precisam estar todos presentes
+
+
+class Tabela:
+    def __init__(self, opcoes, padrao=""):
+        self.opcoes = [(rotulo, [c if isinstance(c, tuple) else (c,) for c in condicoes])
+                       for rotulo, condicoes in opcoes]
+        self.padrao = padrao
+
+
+# Marcas na ordem do TS: vence a primeira com algum gatilho no nome
+MARCAS = [
+    (["nexgard"], ["NexGard", Tabela([("Spectra", ["spectra"])]), "$qtd"]),
+    (["bravecto"], ["Bravecto", Tabela([("Transdermal", ["transdermal", "pipeta", "topico"])],
+                                       padrao="Mastigável"), "$especie"]),
+    (["simparic"], ["Simparic", "$qtd"]),
+    (["golden"], ["Ração Golden", Tabela([
+        ("Special", ["special"]),
+        ("Fórmula", ["formula", "fórmula"]),
+        ("Seleção Natural", ["selecao", "seleção"]),
+        ("Mega", ["mega"]),
+    ]), "$sabor", "$fase", "$porte", "$especie"]),
+    (["premier"], ["Ração Premier", Tabela([
+        ("Fórmula", ["formula", "fórmula"]),
+        ("Raças Específicas", ["especifica", "raça"]),
+        ("Nattu", ["nattu"]),
+        ("Cookie", ["cookie"]),
+    ]), "$sabor", "$fase", "$porte", "$especie"]),
+    (["royal canin"], ["Ração Royal Canin", Tabela([
+        (l.capitalize(), [l]) for l in
+        ["urinary", "satiety", "hypoallergenic", "gastro", "renal", "hepatic", "indoor", "outdoor", "fit"]
+    ]), "$fase", "$porte", "$especie"]),
+    (["formula natural", "fórmula natural"], ["Ração Fórmula Natural", Tabela([
+        ("Life", ["life"]),
+        ("Fresh Meat", ["fresh meat"]),
+        ("Pro", ["pro"]),
+    ]), Tabela([
+        ("Frango", ["frango"]),
+        ("Cordeiro", ["cordeiro"]),
+        ("Salmão", ["salmão", "salmon"]),
+        ("Carne", ["carne"]),
+        ("Peru", ["peru"]),
+    ]), "$fase", "$porte", "$especie"]),
+    (["guabi natural"], ["Ração Guabi Natural", Tabela([
+        ("Frango e Arroz", [("frango", "arroz")]),
+        ("Cordeiro e Aveia", [("cordeiro", "aveia")]),
+        ("Salmão", ["salmão", "salmon"]),
+        ("Frango", ["frango"]),
+        ("Cordeiro", ["cordeiro"]),
+        ("Carne", ["carne"]),
+    ]), "$fase", "$porte", "$especie"]),
+    (["gran plus"], ["Ração Gran Plus", Tabela([
+        ("Choice", ["choice"]),
+        ("Menu", ["menu"]),
+    ]), Tabela([
+        ("Frango e Carne", [("frango", "carne")]),
+        ("Frango", ["frango"]),
+        ("Carne", ["carne"]),
+        ("Salmão", ["salmão", "salmon"]),
+    ]), "$fase", "$porte", "$especie"]),
+    (["hill", "hill's"], ["Ração Hill's", Tabela([
+        ("Prescription Diet", ["prescription"]),
+        ("Science Diet", ["science diet"]),
+        ("Vet Essentials", ["vet essentials"]),
+    ]), Tabela([
+        ("Urinary", ["urinary"]),
+        ("Renal", ["renal", "k/d"]),
+        ("Gastrointestinal", ["gastro", "i/d"]),
+        ("Weight", ["weight", "r/d"]),
+        ("Metabolic", ["metabolic"]),
+    ]), "$fase", "$porte", "$especie"]),
+    (["n&d", "farmina", "n & d"], ["Ração N&D", Tabela([
+        ("Prime", ["prime"]),
+        ("Ancestral Grain", ["ancestral"]),
+        ("Pumpkin", ["pumpkin", "abóbora"]),
+        ("Quinoa", ["quinoa"]),
+        ("Ocean", ["ocean"]),
+        ("Grain Free", ["grain free"]),
+    ]), Tabela([
+        ("Frango", ["frango"]),
+        ("Cordeiro", ["cordeiro"]),
+        ("Javali", ["javali", "boar"]),
+        ("Peixe", ["peixe", "fish"]),
+        ("Bacalhau", ["bacalhau", "cod"]),
+    ]), "$fase", "$porte", "$especie"]),
+    (["areia"], [Tabela([
+        ("Areia Viva Verde para Gatos", ["viva verde"]),
+        ("Areia Pipicat para Gatos", ["pipicat"]),
+    ], padrao="Areia Higiênica para Gatos")]),
+    (["pedigree"], ["Ração Pedigree", "$sabor", "$fase", "$porte", "$especie"]),
+    (["whiskas"], ["Ração Whiskas", "$sabor", "$fase", "para Gatos"]),
+]
+
+# =====================
+# COMPILAÇÃO
+# =====================
+
+# \s e trim() do JavaScript (o \s do Python em Unicode difere em alguns caracteres)
+ESPACOS_JS = ("\t\n\v\f\r \u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006"
+              "\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff")
+_S = "[" + re.escape(ESPACOS_JS) + "]"
+
+RE_PACOTE_3 = re.compile(rf"(?:3{_S}*(?:uni|tab|comp|dos|caps)|cx{_S}*3|pack{_S}*3|c/{_S}*3|c/3)")
+# Fallback: /\d+[.,]?\d*\s*kg/gi e /\d+[.,]?\d*\s*g\b/gi (\d e \b do JS são ASCII)
+RE_PESO_KG = re.compile(rf"[0-9]+[.,]?[0-9]*{_S}*[kK][gG]")
+RE_PESO_G = re.compile(rf"[0-9]+[.,]?[0-9]*{_S}*[gG](?![A-Za-z0-9_])")
+RE_ESPACOS = re.compile(_S + "+")
+
+
+def _termos():
+    termos = set()
+    for tabela in (ESPECIE, FASE, PORTE, SABOR):
+        for _, lista in tabela:
+            termos.update(lista)
+    for gatilhos, partes in MARCAS:
+        termos.update(gatilhos)
+        for parte in partes:
+            if isinstance(parte, Tabela):
+                for _, condicoes in parte.opcoes:
+                    for condicao in condicoes:
+                        termos.update(condicao)
+    return termos
+
+
+def _regex_trie(termos):
+    """Alternação em trie (prefixos comuns fatorados, mais longo primeiro)"""
+    trie = {}
+    for termo in termos:
+        no = trie
+        for ch in termo:
+            no = no.setdefault(ch, {})
+        no[""] = True
+
+    def montar(no):
+        fim = "" in no
+        ramos = [re.escape(ch) + montar(filho) for ch, filho in sorted(no.items()) if ch != ""]
+        if not ramos:
+            return ""
+        corpo = ramos[0] if len(ramos) == 1 else "(?:" + "|".join(ramos) + ")"
+        if fim:
+            # Quantificador guloso: tenta o termo mais longo antes do prefixo
+            return "(?:" + corpo + ")?" if len(ramos) == 1 else corpo + "?"
+        return corpo
+
+    return montar(trie)
+
+
+TERMOS = _termos()
+# Lookahead em cada posição: acha o termo mais longo que começa ali
+RE_TERMOS = re.compile("(?=(" + _regex_trie(TERMOS) + "))")
+# Fecho por prefixo: termo mais longo -> todos os termos que são prefixo dele
+FECHO_PREFIXO = {t: frozenset(p for p in TERMOS if t.startswith(p)) for t in TERMOS}
+# Só estes atravessam palavras; os demais cabem numa palavra do nome
+TERMOS_COM_ESPACO = tuple(sorted(t for t in TERMOS if " " in t))
+
+
+@lru_cache(maxsize=200_000)
+def _termos_da_palavra(palavra):
+    """Termos sem espaço contidos numa palavra (o vocabulário dos nomes se repete muito)"""
+    encontrados = RE_TERMOS.findall(palavra)
+    if not encontrados:
+        return frozenset()
+    return frozenset().union(*[FECHO_PREFIXO[t] for t in encontrados])
+
+
+def termos_presentes(n):
+    """Conjunto dos termos das regras que aparecem em n (mesmo que `termo in n`)"""
+    return frozenset().union(*map(_termos_da_palavra, n.split(" ")),
+                             [t for t in TERMOS_COM_ESPACO if t in n])
+
+
+def _primeiro(tabela, padrao=""):
+    """Compila uma tabela de componente: presentes -> rótulo"""
+    opcoes = [(rotulo, frozenset(termos)) for rotulo, termos in tabela]
+
+    def avaliar(presentes, n):
+        for rotulo, termos in opcoes:
+            if not termos.isdisjoint(presentes):
+                return rotulo
+        return padrao
+    return avaliar
+
+
+def _tabela(tabela):
+    opcoes = [(rotulo, [frozenset(c) for c in condicoes]) for rotulo, condicoes in tabela.opcoes]
+
+    def avaliar(presentes, n):
+        for rotulo, condicoes in opcoes:
+            for condicao in condicoes:
+                if condicao <= presentes:
+                    return rotulo
+        return tabela.padrao
+    return avaliar
+
+
+_especie = _primeiro(ESPECIE)
+_COMPONENTES = {
+    "$sabor": _primeiro(SABOR),
+    "$fase": _primeiro(FASE),
+    "$porte": _primeiro(PORTE),
+    "$especie": lambda presentes, n: "para " + e if (e := _especie(presentes, n)) else "",
+    "$qtd": lambda presentes, n: "3 Comp." if RE_PACOTE_3.search(n) else "1 Comp.",
+}
+
+
+def _compilar_parte(parte):
+    if isinstance(parte, Tabela):
+        return _tabela(parte)
+    if parte in _COMPONENTES:
+        return _COMPONENTES[parte]
+    return lambda presentes, n: parte
+
+
+# Cada marca vira uma lista de funções (presentes, n) -> texto
+_MARCAS = [[_compilar_parte(p) for p in partes] for _, partes in MARCAS]
+# gatilho -> índice da marca (a de menor índice vence, como na ordem dos ifs do TS)
+_GATILHO_MARCA = {}
+for _indice, (_gatilhos, _) in enumerate(MARCAS):
+    for _g in _gatilhos:
+        _GATILHO_MARCA.setdefault(_g, _indice)
+
+
+def _comprimento_js(texto):
+    """length do JavaScript (unidades UTF-16)"""
+    return len(texto.encode("utf-16-le")) // 2
+
+
+# =====================
+# API
+# =====================
+
+def grupo_de_marca(nome):
+    """Grupo dado por uma regra de marca, ou None se o nome cair no fallback"""
+    n = nome.lower()
+    presentes = termos_presentes(n)
+    marcas = [_GATILHO_MARCA[t] for t in presentes if t in _GATILHO_MARCA]
+    if not marcas:
+        return None
+    valores = [parte(presentes, n) for parte in _MARCAS[min(marcas)]]
+    return " ".join(v for v in valores if v)
+
+
+@lru_cache(maxsize=200_000)
+def definir_grupo(nome):
+    if not nome:
+        return "Produto Sem Nome"
+
+    grupo = grupo_de_marca(nome)
+    if grupo is not None:
+        return grupo
+
+    n = nome.lower()
+    # Fallback: nome original sem o peso, para agrupar variações
+    nome_grupo = RE_PESO_KG.sub("", nome) if "kg" in n else nome
+    nome_grupo = RE_ESPACOS.sub(" ", RE_PESO_G.sub("", nome_grupo)).strip(ESPACOS_JS)
+    # Se ficou muito curto, retorna original
+    if len(nome_grupo) < 10 and _comprimento_js(nome_grupo) < 10:
+        return nome
+    return nome_grupo
+
+
+def agrupar(nomes):
+    """definir_grupo para uma lista de nomes (repetidos calculados uma vez)"""
+    grupos = {nome: definir_grupo(nome) for nome in set(nomes)}
+    return [grupos[nome] for nome in nomes]
+
+
+# =====================
+# PESO DO BOTÃO (extrairPesoParaBotao)
+# =====================
+
+_NAO_PALAVRA = "(?![A-Za-z0-9_])"  # \b do JS depois de letra/dígito
+RE_FAIXA_KG = re.compile(rf"([0-9]+[.,]?[0-9]*){_S}*(?:a|-|à|ate|té){_S}*([0-9]+[.,]?[0-9]*){_S}*kg")
+RE_KG = re.compile(rf"([0-9]+[.,]?[0-9]*){_S}*kg")
+RE_QTD = re.compile(rf"([0-9]+){_S}*(?:un|comp|tab)")
+RE_MG = re.compile(rf"([0-9]+){_S}*mg")
+TERMOS_QTD = ["comprimido", "tablete", "un"]
+MARCAS_COM_PESO = ["bravecto", "nexgard"]
+TAMANHOS = [
+    (re.compile(rf"(?<![A-Za-z0-9_])(?:p|pp|pequeno|mini){_NAO_PALAVRA}"), "P"),
+    (re.compile(rf"(?<![A-Za-z0-9_])(?:m|medio|medium){_NAO_PALAVRA}"), "M"),
+    (re.compile(rf"(?<![A-Za-z0-9_])(?:g|grande|large|maxi){_NAO_PALAVRA}"), "G"),
+    (re.compile(rf"(?<![A-Za-z0-9_])(?:gg|xg|gigante|giant){_NAO_PALAVRA}"), "GG"),
+]
+
+
+def _numero_js(texto):
+    """parseFloat + conversão para texto como no JavaScript ("10.10" -> "10.1")"""
+    valor = float(texto)
+    return str(int(valor)) if valor.is_integer() else repr(valor)
+
+
+@lru_cache(maxsize=200_000)
+def extrair_peso_para_botao(nome):
+    if not nome:
+        return "Ver"
+    n = nome.lower()
+
+    # REGRA 1: Faixas de peso (Ex: "2 a 4kg", "4.5-10 kg")
+    m = RE_FAIXA_KG.search(n)
+    if m:
+        p1 = float(m.group(1).replace(",", "."))
+        p2 = float(m.group(2).replace(",", "."))
+        if abs(p2 - p1) < 60:
+            return f"{_numero_js(m.group(1).replace(',', '.'))}-{_numero_js(m.group(2).replace(',', '.'))}kg"
+
+    # REGRA 2: Peso único em KG
+    m = RE_KG.search(n)
+    if m:
+        return f"{m.group(1).replace(',', '.')}kg"
+
+    # REGRA 3: Quantidade (Unidades/Tabletes)
+    if any(t in n for t in TERMOS_QTD):
+        m = RE_QTD.search(n)
+        if m:
+            return f"{m.group(1)} Un."
+
+    # REGRA 4: MG (Miligramas)
+    if "mg" in n and not any(marca in n for marca in MARCAS_COM_PESO):
+        m = RE_MG.search(n)
+        if m:
+            return f"{m.group(1)}mg"
+
+    # REGRA 5: Tamanhos (P, M, G, GG)
+    for regex, rotulo in TAMANHOS:
+        if regex.search(n):
+            return rotulo
+    return "Ver"
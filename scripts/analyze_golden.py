@@ -1,6 +1,9 @@
 import requests
-import re
 import sys
+import argparse
+
+from agrupamento import definir_grupo
+from snapshot import argumento_snapshot, ler
 
 # Config Supabase
 SUPABASE_URL = "https://wgyosfpkctbpeoyxddec.supabase.co"
@@ -11,55 +14,15 @@ headers = {
     "Authorization": f"Bearer {SUPABASE_KEY}"
 }
 
-# Copiando logica exata do utils.ts/analyze_grouping_logic.py
-def definir_grupo(nome):
-    if not nome: return "Sem Nome"
-    n = nome.lower()
-    
-    # Detecção de Componentes
-    especie = ''
-    if any(x in n for x in ['gato', 'felino', 'cat ', 'feline']): especie = 'Gatos'
-    elif any(x in n for x in ['cão', 'cães', 'cachorro', 'dog', 'canino']): especie = 'Cães'
-
-    fase = ''
-    if any(x in n for x in ['filhote', 'puppy', 'kitten', 'junior']): fase = 'Filhotes'
-    elif any(x in n for x in ['senior', 'idoso', '7+', 'mature']): fase = 'Sênior'
-
-    porte = ''
-    if any(x in n for x in ['pequeno', 'small', 'mini', 'toy']): porte = 'Peq.'
-    elif any(x in n for x in ['médio', 'medio', 'medium']): porte = 'Méd.'
-    elif any(x in n for x in ['gigante', 'giant', 'maxi']): porte = 'Gig.'
-    elif any(x in n for x in ['grande', 'large']): porte = 'Gde.'
-
-    sabor = ''
-    sabores = [
-        ('frango', 'Frango'), ('carne', 'Carne'), ('salmão', 'Salmão'), 
-        ('salmon', 'Salmão'), ('cordeiro', 'Cordeiro'), ('peru', 'Peru'), 
-        ('peixe', 'Peixe'), ('vegetal', 'Vegetais'), ('arroz', 'Arroz')
-    ]
-    for termo, label in sabores:
-        if termo in n:
-            sabor = label
-            break
-
-    # Lógica específica Golden
-    if 'golden' in n:
-        linha = ''
-        if 'special' in n: linha = 'Special'
-        elif 'formula' in n or 'fórmula' in n: linha = 'Fórmula'
-        elif 'selecao' in n or 'seleção' in n: linha = 'Seleção Natural'
-        elif 'mega' in n: linha = 'Mega'
-
-        partes = ['Ração Golden', linha, sabor, fase, porte, f"para {especie}" if especie else '']
-        return ' '.join([p for p in partes if p])
-
-    return "Outros"
 
-def analyze():
+def analyze(snapshot=None):
     print("🔍 Buscando produtos Golden Special...")
     # Busca um pouco mais ampla para garantir
-    resp = requests.get(f"{SUPABASE_URL}/rest/v1/produtos?nome=ilike.*golden*&select=nome", headers=headers)
-    products = resp.json()
+    if snapshot:
+        products = [p for p in ler("produtos", "id,nome", snapshot) if 'golden' in (p['nome'] or '').lower()]
+    else:
+        resp = requests.get(f"{SUPABASE_URL}/rest/v1/produtos?nome=ilike.*golden*&select=nome", headers=headers)
+        products = resp.json()
     
     # Filtra apenas Special (e "Especial" por segurança)
     golden_special = [p for p in products if 'special' in p['nome'].lower() or 'especial' in p['nome'].lower()]
@@ -93,4 +56,6 @@ def analyze():
 
 if __name__ == "__main__":
     sys.stdout.reconfigure(encoding='utf-8')
-    analyze()
+    parser = argparse.ArgumentParser(description="Detalha o agrupamento Golden Special")
+    argumento_snapshot(parser)
+    analyze(parser.parse_args().snapshot)
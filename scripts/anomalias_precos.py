@@ -0,0 +1,160 @@
+"""
+Anomalias de preço (vetorizado com numpy), usado por check_data_quality
+Tudo roda sobre colunas numpy da tabela de preços inteira, sem laço por produto:
+
+- por kg: z robusto de log(preço/kg) dentro do grupo do site (definir_grupo),
+  com o peso do botão (extrair_peso_para_botao) ou gramas do nome
+- entre lojas: z robusto de log(preço) entre as lojas do mesmo produto
+- salto: preço atual > SALTO x (ou < 1/SALTO) a mediana do histórico do par
+- ML sem centavos: preço inteiro no ML quando o histórico do par tem o mesmo
+  valor com centavos (só a andes-money-amount__fraction foi lida)
+
+z robusto = 0.6745 * (x - mediana) / MAD (Iglewicz-Hoaglin); grupos com menos
+de MIN_GRUPO preços não são avaliados. Preços marcados que são o menor do
+produto aparecem primeiro: são os que iriam para o selo "Menor preço".
+"""
+import math
+import re
+
+import numpy as np
+
+from agrupamento import definir_grupo, extrair_peso_para_botao
+
+LIMITE_Z = 3.5
+# MAD mínimo em log (~10%): com 3 lojas quase iguais, a quarta só é marcada acima de ~1.7x
+MAD_MINIMO = 0.1
+MIN_GRUPO = 3
+SALTO = 3.0
+# Nomes do Mercado Livre: "ML" no scraper Python, "Mercado Livre" no scraper/mercado-livre.ts
+LOJAS_ML = ("ML", "Mercado Livre")
+PRECO_MINIMO = 1.00
+PRECO_MAXIMO = 5000
+
+RE_KG_BOTAO = re.compile(r"^(\d+(?:\.\d+)?)kg$")
+RE_GRAMAS = re.compile(r"(\d+(?:[.,]\d+)?)\s*(?:g|gr|gramas?)\b", re.IGNORECASE)
+
+
+def peso_kg(nome):
+    """Peso em kg pelo rótulo do botão ("15kg"; faixas como "10-20kg" são do pet, não contam)
+    ou por gramas no nome; nan se não houver"""
+    m = RE_KG_BOTAO.match(extrair_peso_para_botao(nome))
+    if m:
+        return float(m.group(1))
+    m = RE_GRAMAS.search(nome or "")
+    if m:
+        return float(m.group(1).replace(",", ".")) / 1000
+    return math.nan
+
+
+def montar_tabela(linhas):
+    """Colunas numpy a partir de dicts {'id', 'produto_id', 'nome', 'loja', 'preco'}"""
+    nomes = [l['nome'] or "" for l in linhas]
+    grupos = {}
+    return {
+        'id': np.array([l['id'] for l in linhas], dtype=np.int64),
+        'produto_id': np.array([l['produto_id'] for l in linhas], dtype=np.int64),
+        'nome': nomes,
+        'loja': np.array([l['loja'] or "" for l in linhas], dtype=object),
+        'preco': np.array([l['preco'] if l['preco'] is not None else np.nan for l in linhas], dtype=float),
+        'peso_kg': np.array([peso_kg(n) for n in nomes], dtype=float),
+        'grupo': np.array([grupos.setdefault(definir_grupo(n), len(grupos)) for n in nomes], dtype=np.int64),
+    }
+
+
+def montar_historico(linhas):
+    """Colunas numpy do historico_precos ({'id', 'produto_id', 'loja', 'preco'})"""
+    linhas = [l for l in linhas if l.get('preco') is not None]
+    return {
+        'id': np.array([l['id'] for l in linhas], dtype=np.int64),
+        'produto_id': np.array([l['produto_id'] for l in linhas], dtype=np.int64),
+        'loja': np.array([l['loja'] or "" for l in linhas], dtype=object),
+        'preco': np.array([l['preco'] for l in linhas], dtype=float),
+    }
+
+
+def _por_grupo(codigos, valores):
+    """(mediana do grupo, tamanho do grupo) alinhados a cada linha"""
+    if not len(codigos):
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    ordem = np.lexsort((valores, codigos))
+    c, v = codigos[ordem], valores[ordem]
+    inicio = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+    tamanho = np.diff(np.r_[inicio, len(c)])
+    mediana = (v[inicio + (tamanho - 1) // 2] + v[inicio + tamanho // 2]) / 2
+    por_linha = np.empty(len(c))
+    por_linha[ordem] = np.repeat(mediana, tamanho)
+    n = np.empty(len(c), dtype=np.int64)
+    n[ordem] = np.repeat(tamanho, tamanho)
+    return por_linha, n
+
+
+def z_robusto(codigos, valores):
+    """z robusto de cada valor dentro do seu grupo (0 em grupos pequenos)"""
+    mediana, n = _por_grupo(codigos, valores)
+    mad, _ = _por_grupo(codigos, np.abs(valores - mediana))
+    z = 0.6745 * (valores - mediana) / np.maximum(mad, MAD_MINIMO)
+    z[n < MIN_GRUPO] = 0
+    return z
+
+
+def _chave_par(produto_id, loja, codigo_loja):
+    return produto_id * len(codigo_loja) + np.array([codigo_loja[l] for l in loja], dtype=np.int64)
+
+
+def analisar(tabela, historico=None):
+    """Dict motivo -> índices (na tabela) das linhas marcadas"""
+    preco = tabela['preco']
+    valido = np.isfinite(preco) & (preco > 0)
+    achados = {
+        'zerado': np.flatnonzero(~valido),
+        'fora_da_faixa': np.flatnonzero(valido & ((preco < PRECO_MINIMO) | (preco > PRECO_MAXIMO))),
+    }
+
+    # Preço por kg dentro do grupo do site
+    com_peso = np.flatnonzero(valido & (tabela['peso_kg'] > 0))
+    z = z_robusto(tabela['grupo'][com_peso], np.log(preco[com_peso] / tabela['peso_kg'][com_peso]))
+    achados['preco_kg_no_grupo'] = com_peso[np.abs(z) > LIMITE_Z]
+
+    # Mesmo produto entre lojas
+    indices = np.flatnonzero(valido)
+    z = z_robusto(tabela['produto_id'][indices], np.log(preco[indices]))
+    achados['entre_lojas'] = indices[np.abs(z) > LIMITE_Z]
+
+    if historico is not None and len(historico['preco']):
+        lojas = sorted(set(tabela['loja']) | set(historico['loja']))
+        codigo_loja = {l: i for i, l in enumerate(lojas)}
+        chave_h = _chave_par(historico['produto_id'], historico['loja'], codigo_loja)
+        chave = _chave_par(tabela['produto_id'], tabela['loja'], codigo_loja)
+
+        # Salto contra a mediana do histórico do par
+        mediana_h, _ = _por_grupo(chave_h, historico['preco'])
+        pares, primeiro = np.unique(chave_h, return_index=True)
+        pos = np.clip(np.searchsorted(pares, chave), 0, len(pares) - 1)
+        tem = (pares[pos] == chave) & valido
+        referencia = np.where(tem, mediana_h[primeiro[pos]], np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            razao = preco / referencia
+        achados['salto_historico'] = np.flatnonzero(tem & ((razao > SALTO) | (razao < 1 / SALTO)))
+
+        # ML: preço inteiro quando o histórico do par tem o mesmo inteiro com centavos
+        com_centavos = np.abs(historico['preco'] - np.round(historico['preco'])) >= 0.005
+        inteiro_h = chave_h[com_centavos] * 1_000_000 + np.floor(historico['preco'][com_centavos]).astype(np.int64)
+        inteiro_ml = np.flatnonzero(valido & np.isin(tabela['loja'], LOJAS_ML) & (preco == np.round(preco)))
+        alvo = chave[inteiro_ml] * 1_000_000 + preco[inteiro_ml].astype(np.int64)
+        achados['ml_sem_centavos'] = inteiro_ml[np.isin(alvo, inteiro_h)]
+    return achados
+
+
+def menor_do_produto(tabela):
+    """Máscara: a linha tem o menor preço válido do seu produto (ganharia o selo)"""
+    preco = np.where(np.isfinite(tabela['preco']) & (tabela['preco'] > 0), tabela['preco'], np.inf)
+    produto = tabela['produto_id']
+    if not len(produto):
+        return np.zeros(0, dtype=bool)
+    ordem = np.lexsort((preco, produto))
+    p = produto[ordem]
+    inicio = np.flatnonzero(np.r_[True, p[1:] != p[:-1]])
+    tamanho = np.diff(np.r_[inicio, len(p)])
+    minimo = np.empty(len(p))
+    minimo[ordem] = np.repeat(preco[ordem][inicio], tamanho)
+    return np.isfinite(preco) & (preco == minimo)
@@ -0,0 +1,132 @@
+"""
+Benchmark do perfil do Chrome: enxuto x completo
+Para cada loja abre um Chrome por perfil, busca os mesmos termos do CSV e mede:
+
+- pronto: driver.get + espera do primeiro card de resultado (s)
+- rede: bytes recebidos por página (Network.loadingFinished do log de
+  performance), contando o que ainda carrega ESPERA_REDE s depois do card
+- bloqueadas: requisições cortadas pelo perfil
+- achados / com imagem: o extrator ainda acha o produto e a URL da imagem
+
+    python scripts/benchmark_perfil.py                        # 5 termos por loja
+    python scripts/benchmark_perfil.py --lojas Petz,ML --termos 10
+"""
+import sys
+import argparse
+import json
+import statistics
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+from lojas import LOJAS, montar_url, seletor_card
+from navegadores import PERFIS, fechar_driver
+from produtos_csv import carregar_csv
+from scrape_from_csv import ESPERA_CARD, _extrair_card, criar_driver
+
+# Tempo (s) depois do card para o resto da página terminar de baixar
+ESPERA_REDE = 3
+
+
+def ler_rede(driver):
+    """(bytes recebidos, requisições bloqueadas) desde a última leitura do log"""
+    recebidos = bloqueadas = 0
+    for entrada in driver.get_log('performance'):
+        msg = json.loads(entrada['message'])['message']
+        if msg['method'] == 'Network.loadingFinished':
+            recebidos += msg['params'].get('encodedDataLength', 0)
+        elif msg['method'] == 'Network.loadingFailed' and msg['params'].get('blockedReason'):
+            bloqueadas += 1
+    return recebidos, bloqueadas
+
+
+def medir(driver, loja, termo):
+    """{'pronto', 'bytes', 'bloqueadas', 'achado', 'imagem'} de uma busca"""
+    ler_rede(driver)  # descarta o que sobrou da página anterior
+    t0 = time.perf_counter()
+    pronto = None
+    try:
+        driver.get(montar_url(loja, termo))
+        WebDriverWait(driver, ESPERA_CARD, poll_frequency=0.1).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, seletor_card(loja))))
+        pronto = time.perf_counter() - t0
+    except TimeoutException:
+        pass
+    time.sleep(ESPERA_REDE)
+    recebidos, bloqueadas = ler_rede(driver)
+    resultado = _extrair_card(driver, loja) if pronto is not None else None
+    return {'pronto': pronto, 'bytes': recebidos, 'bloqueadas': bloqueadas,
+            'achado': resultado is not None, 'imagem': bool(resultado and resultado.get('imagem'))}
+
+
+def rodar(lojas, termos):
+    """{(loja, perfil): [medições]}"""
+    medicoes = {}
+    for loja in lojas:
+        for perfil in PERFIS:
+            print(f"🌐 {loja} ({perfil})...")
+            driver = criar_driver(perfil, medir_rede=True)
+            try:
+                medicoes[loja, perfil] = [medir(driver, loja, termo) for termo in termos]
+            finally:
+                fechar_driver(driver)
+    return medicoes
+
+
+def resumo(medidas):
+    prontos = [m['pronto'] for m in medidas if m['pronto'] is not None]
+    return {
+        'pronto': statistics.median(prontos) if prontos else None,
+        'mb': statistics.mean(m['bytes'] for m in medidas) / 1024 / 1024,
+        'bloqueadas': statistics.mean(m['bloqueadas'] for m in medidas),
+        'achados': sum(m['achado'] for m in medidas),
+        'imagens': sum(m['imagem'] for m in medidas),
+        'n': len(medidas),
+    }
+
+
+def mostrar(medicoes, lojas):
+    print("\n" + "=" * 78)
+    print(f"{'Loja':<9}{'Perfil':<10}{'pronto (med.)':>14}{'MB/página':>11}{'bloq./pág.':>12}"
+          f"{'achados':>10}{'c/ imagem':>11}")
+    print("-" * 78)
+    for loja in lojas:
+        r = {perfil: resumo(medicoes[loja, perfil]) for perfil in PERFIS}
+        for perfil in PERFIS:
+            x = r[perfil]
+            pronto = f"{x['pronto']:.2f}s" if x['pronto'] is not None else "-"
+            print(f"{loja:<9}{perfil:<10}{pronto:>14}{x['mb']:>11.2f}{x['bloqueadas']:>12.1f}"
+                  f"{x['achados']:>6}/{x['n']:<3}{x['imagens']:>7}/{x['n']:<3}")
+        enxuto, completo = r['enxuto'], r['completo']
+        partes = []
+        if enxuto['pronto'] and completo['pronto']:
+            partes.append(f"pronto {enxuto['pronto'] / completo['pronto'] - 1:+.0%}")
+        if completo['mb']:
+            partes.append(f"rede {enxuto['mb'] / completo['mb'] - 1:+.0%}")
+        if partes:
+            print(f"{'':<9}↪️ enxuto: {' | '.join(partes)}")
+        if enxuto['imagens'] < completo['imagens']:
+            print(f"{'':<9}⚠️ enxuto perdeu imagens ({enxuto['imagens']} x {completo['imagens']})")
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Compara os perfis enxuto e completo do Chrome")
+    parser.add_argument("--lojas", default=",".join(LOJAS), help="Lojas, ex: Petz,ML (padrão: todas)")
+    parser.add_argument("--termos", type=int, default=5, help="Termos do CSV por loja")
+    args = parser.parse_args()
+
+    lojas = [l.strip() for l in args.lojas.split(',') if l.strip()]
+    desconhecidas = set(lojas) - set(LOJAS)
+    if desconhecidas:
+        sys.exit(f"❌ Lojas desconhecidas: {', '.join(sorted(desconhecidas))}")
+    termos = [p['termo'] for p in carregar_csv()[:args.termos]]
+    print(f"📋 {len(termos)} termos x {len(lojas)} lojas x {len(PERFIS)} perfis")
+    mostrar(rodar(lojas, termos), lojas)
+
+
+if __name__ == "__main__":
+    main()
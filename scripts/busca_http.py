@@ -0,0 +1,260 @@
+"""
+Busca RÁPIDA via HTTP puro (sem navegador)
+Baixa a página de busca com conexões keep-alive reaproveitadas e extrai o
+primeiro card do HTML inicial. Se a loja renderiza os resultados só no
+navegador, retorna None e o scraper cai para o Chrome. Bloqueio (403/429 ou
+página de captcha) levanta ritmo.Bloqueio para o worker decidir o que fazer.
+Os cards saem no mesmo formato do extrator JS do navegador (lojas.py).
+"""
+import threading
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+
+from lojas import (SELETORES_NOME, SELETORES_PRECO, TOP_K_CARDS, escolher_resultado,
+                   listas_reduzidas, listas_seletores, seletor_card)
+from ritmo import STATUS_BLOQUEIO, Bloqueio, motivo_bloqueio
+
+HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+}
+TIMEOUT = (3, 8)  # conexão, leitura
+
+# Tags que não têm fechamento (não entram na pilha)
+TAGS_VAZIAS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+               'link', 'meta', 'source', 'track', 'wbr'}
+
+# Uma Session por thread (o modo com abas busca em threads); nova_sessao() só
+# avança a geração e cada thread troca a sua antes da próxima busca, então
+# nenhuma Session é fechada no meio de uma requisição
+_local = threading.local()
+_geracao = 0
+_trava = threading.Lock()
+
+
+def get_session():
+    """Session da thread: reaproveita conexões TCP/TLS entre buscas"""
+    geracao = _geracao
+    session = getattr(_local, 'session', None)
+    if session is not None and _local.geracao == geracao:
+        return session
+    if session is not None:
+        session.close()
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(HEADERS)
+    _local.session, _local.geracao = session, geracao
+    return session
+
+
+def nova_sessao():
+    """Descarta as Sessions (cookies e conexões): a próxima busca de cada thread começa do zero"""
+    global _geracao
+    with _trava:
+        _geracao += 1
+
+
+def _parse_seletor(seletor):
+    """Converte um seletor CSS simples em (tag, trecho_de_classe, classe_exata).
+    Suporta: 'tag', '.classe', 'tag.classe', "[class*='trecho']"."""
+    seletor = seletor.strip()
+    if seletor.startswith('[class*='):
+        return (None, seletor[len('[class*='):-1].strip('\'"'), None)
+    if '.' in seletor:
+        tag, classe = seletor.split('.', 1)
+        return (tag or None, None, classe)
+    return (seletor, None, None)
+
+
+def _casa(regra, tag, classes, classe_attr):
+    tag_regra, trecho, exata = regra
+    if tag_regra and tag_regra != tag:
+        return False
+    if trecho is not None and trecho not in classe_attr:
+        return False
+    if exata is not None and exata not in classes:
+        return False
+    return True
+
+
+class ExtratorCards(HTMLParser):
+    """Extrai os primeiros cards de resultado do HTML estático.
+
+    Para cada card guarda o primeiro texto não vazio de cada seletor de nome
+    e de preço, o primeiro <img> e o primeiro <a>, reproduzindo o que o
+    scraper de navegador lê via find_element. Só os seletores passados são
+    testados em cada tag (a lista da telemetria da loja costuma ser menor).
+    """
+
+    def __init__(self, loja, max_cards=1, seletores_nome=SELETORES_NOME, seletores_preco=SELETORES_PRECO):
+        super().__init__(convert_charrefs=True)
+        self.loja = loja
+        self.max_cards = max_cards
+        self.regras_card = [_parse_seletor(s) for s in seletor_card(loja).split(',')]
+        self.regras_nome = [_parse_seletor(s) for s in seletores_nome]
+        self.regras_preco = [_parse_seletor(s) for s in seletores_preco]
+        self.cards = []
+        self.pilha = []
+        self.card = None
+        self.card_nivel = None
+        self.capturas = []  # [nivel, tipo, indice_seletor, partes]
+        self.dentro_s = 0   # preço riscado (<s>) do ML
+
+    def handle_starttag(self, tag, attrs):
+        if len(self.cards) >= self.max_cards and self.card is None:
+            return
+        attrs = dict(attrs)
+        classe_attr = attrs.get('class') or ''
+        classes = classe_attr.split()
+        vazia = tag in TAGS_VAZIAS
+
+        if self.card is None:
+            if any(_casa(r, tag, classes, classe_attr) for r in self.regras_card) and not vazia:
+                self.card = {'nomes': {}, 'precos': {}, 'fracao': None, 'centavos': None,
+                             'img': None, 'link': None}
+                self.card_nivel = len(self.pilha)
+        else:
+            nivel = len(self.pilha)
+            if tag == 's':
+                self.dentro_s += 1
+            if tag == 'img' and self.card['img'] is None:
+                self.card['img'] = attrs
+            if tag == 'a' and self.card['link'] is None and attrs.get('href'):
+                self.card['link'] = attrs['href']
+            if not vazia:
+                for i, r in enumerate(self.regras_nome):
+                    if i not in self.card['nomes'] and _casa(r, tag, classes, classe_attr):
+                        self.capturas.append([nivel, 'nomes', i, []])
+                for i, r in enumerate(self.regras_preco):
+                    if _casa(r, tag, classes, classe_attr):
+                        self.capturas.append([nivel, 'precos', i, []])
+                if not self.dentro_s:
+                    if 'andes-money-amount__fraction' in classes and self.card['fracao'] is None:
+                        self.capturas.append([nivel, 'fracao', 0, []])
+                    elif 'andes-money-amount__cents' in classes and self.card['centavos'] is None:
+                        self.capturas.append([nivel, 'centavos', 0, []])
+
+        if not vazia:
+            self.pilha.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag not in self.pilha:
+            return
+        # Fecha também as tags que ficaram abertas no meio (HTML malformado)
+        while self.pilha:
+            aberta = self.pilha.pop()
+            nivel = len(self.pilha)
+            self._fecha_capturas(nivel)
+            if self.card is not None:
+                if aberta == 's' and self.dentro_s:
+                    self.dentro_s -= 1
+                if nivel == self.card_nivel:
+                    self.cards.append(self.card)
+                    self.card = None
+                    self.capturas = []
+                    self.dentro_s = 0
+            if aberta == tag:
+                break
+
+    def handle_data(self, data):
+        for captura in self.capturas:
+            captura[3].append(data)
+
+    def _fecha_capturas(self, nivel):
+        restantes = []
+        for captura in self.capturas:
+            nivel_cap, tipo, i, partes = captura
+            if nivel_cap < nivel:
+                restantes.append(captura)
+                continue
+            texto = ' '.join(''.join(partes).split())
+            if not texto:
+                continue
+            if tipo == 'nomes':
+                self.card['nomes'].setdefault(i, texto)
+            elif tipo == 'precos':
+                self.card['precos'].setdefault(i, []).append(texto)
+            else:
+                self.card[tipo] = texto
+        self.capturas = restantes
+
+
+def _normalizar_card(card, seletores_nome=SELETORES_NOME, seletores_preco=SELETORES_PRECO):
+    """Converte o card do parser no formato de lojas.montar_resultado"""
+    nome = seletor_nome = None
+    for i, seletor in enumerate(seletores_nome):
+        if card['nomes'].get(i):
+            nome, seletor_nome = card['nomes'][i], seletor
+            break
+    precos, seletores_precos = [], []
+    for i, seletor in enumerate(seletores_preco):
+        textos = card['precos'].get(i, [])
+        precos.extend(textos)
+        seletores_precos.extend([seletor] * len(textos))
+    img = card['img']
+    imagem = None
+    if img is not None:
+        imagem = {'src': img.get('src'), 'data-src': img.get('data-src'),
+                  'data-lazy-src': img.get('data-lazy-src')}
+    return {'nome': nome, 'seletor_nome': seletor_nome, 'precos': precos,
+            'seletores_precos': seletores_precos, 'fracao': card['fracao'],
+            'centavos': card['centavos'], 'imagem': imagem, 'link': card['link']}
+
+
+def extrair_cards(loja, html, seletores_nome=SELETORES_NOME, seletores_preco=SELETORES_PRECO):
+    """Cards do topo da busca no formato de lojas.montar_resultado"""
+    extrator = ExtratorCards(loja, TOP_K_CARDS, seletores_nome, seletores_preco)
+    extrator.feed(html)
+    extrator.close()
+    if extrator.card is not None:
+        # Card aberto até o fim do documento (HTML truncado)
+        extrator._fecha_capturas(0)
+        extrator.cards.append(extrator.card)
+    return [_normalizar_card(c, seletores_nome, seletores_preco) for c in extrator.cards]
+
+
+def parse_resultado(loja, html, seletores=None):
+    """Extrai o primeiro produto completo dos TOP_K_CARDS da busca (ou None).
+    `seletores` é a ordem da telemetria da loja; se ela não completar nenhum
+    card, repete com a lista padrão inteira."""
+    nomes, precos = listas_seletores(seletores)
+    cards = extrair_cards(loja, html, nomes, precos)
+    resultado = escolher_resultado(loja, cards)
+    if resultado is None and cards and listas_reduzidas(nomes, precos):
+        resultado = escolher_resultado(loja, extrair_cards(loja, html))
+        if resultado:
+            resultado['seletores']['reserva'] = True
+    return resultado
+
+
+def buscar_produto_http(loja, url, seletores=None):
+    """Tenta buscar sem navegador. Retorna None se a página não trouxer o card
+    pronto no HTML (SPA, erro HTTP) para o chamador usar o Chrome.
+    Levanta Bloqueio em 403/429 ou página de captcha."""
+    try:
+        resp = get_session().get(url, timeout=TIMEOUT)
+        if resp.status_code in STATUS_BLOQUEIO:
+            raise Bloqueio(f"http_{resp.status_code}")
+        if resp.status_code != 200 or 'html' not in resp.headers.get('Content-Type', 'text/html'):
+            return None
+        resultado = parse_resultado(loja, resp.text, seletores)
+        if resultado is None:
+            motivo = motivo_bloqueio(texto=resp.text)
+            if motivo:
+                raise Bloqueio(motivo)
+        else:
+            # O navegador devolve URLs absolutas; aqui resolvemos as relativas
+            for campo in ('link', 'imagem'):
+                if resultado.get(campo):
+                    resultado[campo] = urljoin(resp.url, resultado[campo])
+        return resultado
+    except Bloqueio:
+        raise
+    except Exception:
+        return None
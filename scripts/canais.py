@@ -0,0 +1,48 @@
+"""
+Canais entre o coordenador e os workers (sem multiprocessing.Manager)
+- tarefas: multiprocessing.Queue comum (sem o processo servidor de proxies do
+  Manager, cada put/get não é mais uma chamada remota)
+- resultados: um Pipe só de ida por worker; o coordenador dorme em
+  multiprocessing.connection.wait até algum worker mandar algo (sem polling)
+  e lê de uma vez tudo o que já chegou. Quando um worker morre, o fim do
+  pipe (EOFError) avisa o coordenador.
+"""
+from multiprocessing import Pipe
+from multiprocessing.connection import wait
+
+
+class Resultados:
+    """Lado do coordenador: um pipe por worker, agrupados por dono (loja)"""
+
+    def __init__(self):
+        self.donos = {}  # leitor -> dono
+
+    def novo_canal(self, dono=None):
+        """Ponta de escrita para passar ao worker (feche a cópia do pai depois do start())"""
+        leitor, escritor = Pipe(duplex=False)
+        self.donos[leitor] = dono
+        return escritor
+
+    def receber(self, timeout=None):
+        """Mensagens já disponíveis, esperando até `timeout` s pela primeira.
+        Retorna (mensagens, donos cujo worker fechou o canal)."""
+        mensagens, fechados = [], []
+        for leitor in wait(list(self.donos), timeout):
+            try:
+                while True:
+                    mensagens.append(leitor.recv())
+                    if not leitor.poll():
+                        break
+            except (EOFError, OSError):
+                fechados.append(self.donos.pop(leitor))
+                leitor.close()
+        return mensagens, fechados
+
+    def abertos(self, *donos):
+        """Canais ainda abertos (só os dos `donos`, se informados)"""
+        return sum(1 for d in self.donos.values() if not donos or d in donos)
+
+    def fechar(self):
+        for leitor in self.donos:
+            leitor.close()
+        self.donos = {}
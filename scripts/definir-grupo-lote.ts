@@ -0,0 +1,34 @@
+/**
+ * Roda definirGrupo e extrairPesoParaBotao (src/lib/agrupamento.ts) sobre uma lista de nomes.
+ * Usado por scripts/paridade_agrupamento.py para comparar com o motor Python.
+ *
+ * Entrada (stdin):  {"nomes": [...], "repeticoes": 5}
+ * Saída (stdout):   {"grupos": [...], "pesos": [...], "segundos": 0.12}
+ *   segundos = tempo médio de uma passada de definirGrupo (sem contar o startup)
+ *
+ * Uso: echo '{"nomes": ["Ração Golden 15kg"]}' | npx tsx scripts/definir-grupo-lote.ts
+ */
+import { definirGrupo, extrairPesoParaBotao } from '../src/lib/agrupamento';
+
+async function lerStdin(): Promise<string> {
+    const partes: Buffer[] = [];
+    for await (const parte of process.stdin) partes.push(parte as Buffer);
+    return Buffer.concat(partes).toString('utf-8');
+}
+
+async function main() {
+    const { nomes, repeticoes = 1 } = JSON.parse(await lerStdin()) as { nomes: string[]; repeticoes?: number };
+
+    const grupos = nomes.map(nome => definirGrupo(nome));
+    const pesos = nomes.map(nome => extrairPesoParaBotao(nome));
+
+    const inicio = process.hrtime.bigint();
+    for (let r = 0; r < repeticoes; r++) {
+        for (const nome of nomes) definirGrupo(nome);
+    }
+    const segundos = Number(process.hrtime.bigint() - inicio) / 1e9 / repeticoes;
+
+    process.stdout.write(JSON.stringify({ grupos, pesos, segundos }));
+}
+
+main();
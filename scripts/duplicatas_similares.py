@@ -0,0 +1,273 @@
+"""
+Detector de quase-duplicatas em produtos (MinHash + LSH)
+Pega o que list_duplicates não vê: "15kg" x "15 kg", acentos, títulos
+reescritos pela loja. Sem comparar todos contra todos:
+
+1. normaliza o nome (minúsculas, sem acentos, unidades juntas, sem pontuação)
+   e monta o bloco: peso do botão do site (extrair_peso_para_botao), termos
+   com número ou tamanho (300ml, n2, 7+, P/M/G), espécie (cão/gato) e o grupo
+   da regra de marca (grupo_de_marca do nome normalizado); só produtos do mesmo bloco podem ser
+   duplicatas, assim 300ml x 700ml, Dog x Cat ou Filhotes x Sênior não se misturam
+2. nomes que normalizam igual já são duplicatas (score 1.0); para os demais,
+   assinatura MinHash dos trigramas de caracteres das palavras restantes
+   (matriz nomes x permutações, calculada em lotes com numpy)
+3. LSH: assinaturas divididas em bandas; nomes que colidem em alguma banda
+   (dentro do mesmo bloco) viram candidatos
+4. candidatos com similaridade estimada pela assinatura perto do limiar têm o
+   Jaccard real calculado; os que passam do limiar são unidos em clusters
+
+    python scripts/duplicatas_similares.py
+    python scripts/duplicatas_similares.py --snapshot --limiar 0.7 --saida clusters.json
+
+Requer numpy.
+"""
+import argparse
+import json
+import re
+import sys
+import time
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+from agrupamento import extrair_peso_para_botao, grupo_de_marca
+from snapshot import argumento_snapshot, fonte
+
+PERMUTACOES = 64
+BANDAS = 16          # 16 bandas x 4 linhas: colisão provável a partir de Jaccard ~0.5
+LIMIAR = 0.7
+TAMANHO_SHINGLE = 3
+# Baldes maiores que isso são genéricos demais (ex.: nomes vazios); ignorados
+MAX_BALDE = 200
+# Folga da estimativa MinHash (64 permutações: desvio ~0.06) antes do Jaccard real
+FOLGA_ESTIMATIVA = 0.15
+LOTE_ASSINATURAS = 2000
+
+_PRIMO = np.uint64(4294967311)  # primo > 2^32
+_rng = np.random.default_rng(20240501)
+_A = _rng.integers(1, 2 ** 31, PERMUTACOES, dtype=np.uint64)
+_B = _rng.integers(0, 2 ** 31, PERMUTACOES, dtype=np.uint64)
+# Multiplicadores ímpares para resumir cada banda num uint64
+_MISTURA = _rng.integers(1, 2 ** 63, PERMUTACOES, dtype=np.uint64) | np.uint64(1)
+
+RE_NUMERO_UNIDADE = re.compile(
+    r"(\d+(?:[.,]\d+)?)\s*(kg|kilos?|quilos?|gramas?|gr|g|ml|mg|l|litros?|un|unidades?|comprimidos?)\b")
+UNIDADES = {"kilo": "kg", "kilos": "kg", "quilo": "kg", "quilos": "kg", "grama": "g", "gramas": "g",
+            "gr": "g", "litro": "l", "litros": "l", "unidade": "un", "unidades": "un",
+            "comprimido": "un", "comprimidos": "un"}
+RE_NAO_ALFANUM = re.compile(r"[^a-z0-9+]+")
+RE_DIGITO = re.compile(r"\d")
+TAMANHOS = {"pp", "p", "m", "g", "gg", "xg", "xgg"}
+ESPECIES = {"cao": "cao", "caes": "cao", "cachorro": "cao", "cachorros": "cao", "dog": "cao", "dogs": "cao",
+            "gato": "gato", "gatos": "gato", "cat": "gato", "cats": "gato", "felino": "gato", "felinos": "gato"}
+
+
+def sem_acentos(texto):
+    # O que não vira ASCII some; o resto da normalização já descarta não-alfanuméricos
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+
+
+def _medida(m):
+    numero = m.group(1).replace(",", ".")
+    if "." in numero:
+        numero = numero.rstrip("0").rstrip(".")
+    return f" {numero}{UNIDADES.get(m.group(2), m.group(2))} "
+
+
+def _distintivo(palavra):
+    return palavra in TAMANHOS or RE_DIGITO.search(palavra) is not None
+
+
+def normalizar(nome):
+    """(texto sem os termos distintivos, bloco (peso do botão, distintivos, espécies, grupo da marca))"""
+    texto = sem_acentos(nome.lower())
+    # "15 kg" / "15KG" / "15,0 quilos" -> "15kg"
+    texto = RE_NUMERO_UNIDADE.sub(_medida, texto)
+    palavras = RE_NAO_ALFANUM.sub(" ", texto).split()
+    distintivos = frozenset(p for p in palavras if _distintivo(p))
+    especies = frozenset(ESPECIES[p] for p in palavras if p in ESPECIES)
+    texto = " ".join(p for p in palavras if p not in distintivos)
+    peso = RE_NUMERO_UNIDADE.sub(_medida, extrair_peso_para_botao(nome)).strip()
+    # Marca sobre as palavras já normalizadas (a espécie já está no bloco), para
+    # cópias com ou sem acento e "cães"/"cachorro" caírem no mesmo bloco
+    marca = grupo_de_marca(" ".join(p for p in palavras if p not in ESPECIES))
+    return texto, (peso, distintivos, especies, marca)
+
+
+def shingles(texto, k=TAMANHO_SHINGLE):
+    # Textos curtos viram um shingle só, completado com espaços (igual em assinaturas)
+    texto = texto.ljust(k)
+    return {texto[i:i + k] for i in range(len(texto) - k + 1)}
+
+
+def assinaturas(textos):
+    """MinHash: para cada permutação (a*x + b) mod p, o menor valor entre os trigramas.
+    Os textos normalizados são ASCII, então o trigrama é o próprio código de 24 bits.
+    Matriz len(textos) x PERMUTACOES."""
+    saida = np.empty((len(textos), PERMUTACOES), dtype=np.uint64)
+    for inicio in range(0, len(textos), LOTE_ASSINATURAS):
+        lote = [t.ljust(TAMANHO_SHINGLE) for t in textos[inicio:inicio + LOTE_ASSINATURAS]]
+        dados = np.frombuffer("".join(t + "\n" for t in lote).encode("ascii"), dtype=np.uint8).astype(np.uint64)
+        codigos = (dados[:-2] << np.uint64(16)) | (dados[1:-1] << np.uint64(8)) | dados[2:]
+        quebra = dados == 10
+        valido = ~(quebra[:-2] | quebra[1:-1] | quebra[2:])
+        # Cada texto tem >= 1 trigrama válido, em ordem: o início de cada um é onde o dono muda
+        dono = np.repeat(np.arange(len(lote)), [len(t) + 1 for t in lote])[:len(codigos)][valido]
+        inicios = np.flatnonzero(np.r_[True, dono[1:] != dono[:-1]])
+        valores = (codigos[valido][:, None] * _A[None, :] + _B[None, :]) % _PRIMO
+        saida[inicio:inicio + len(lote)] = np.minimum.reduceat(valores, inicios, axis=0)
+    return saida
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _pares_dos_baldes(ordem, quebra):
+    """Todos os pares dentro de cada balde (faixas consecutivas de `ordem`)"""
+    tamanhos = np.diff(np.r_[0, quebra, len(ordem)])
+    fim = np.repeat(np.cumsum(tamanhos), tamanhos)
+    # Posição k forma par com k+1 .. fim-1 do seu balde
+    quantos = fim - np.arange(len(ordem)) - 1
+    primeiro = np.repeat(np.arange(len(ordem)), quantos)
+    base = np.repeat(np.cumsum(quantos) - quantos, quantos)
+    segundo = primeiro + 1 + np.arange(len(primeiro)) - base
+    return ordem[primeiro], ordem[segundo]
+
+
+def candidatos(blocos, sigs, bandas=BANDAS):
+    """Pares (i, j), i < j, que colidem em alguma banda do LSH dentro do mesmo bloco"""
+    n = len(blocos)
+    linhas = PERMUTACOES // bandas
+    codigos = []
+    ignorados = 0
+    for b in range(bandas):
+        faixa = slice(b * linhas, (b + 1) * linhas)
+        # Banda resumida num uint64 (overflow proposital); colisão espúria só
+        # gera um candidato a mais, que o Jaccard descarta
+        resumo = (sigs[:, faixa] * _MISTURA[faixa]).sum(axis=1)
+        ordem = np.lexsort((resumo, blocos))
+        chave_b, chave_r = blocos[ordem], resumo[ordem]
+        quebra = np.flatnonzero((chave_b[1:] != chave_b[:-1]) | (chave_r[1:] != chave_r[:-1])) + 1
+        tamanhos = np.diff(np.r_[0, quebra, n])
+        grandes = tamanhos > MAX_BALDE
+        if grandes.any():
+            ignorados += int(grandes.sum())
+            # Itens de baldes grandes ficam fora desta banda
+            manter = np.repeat(~grandes, tamanhos)
+            ordem, chave_b, chave_r = ordem[manter], chave_b[manter], chave_r[manter]
+            quebra = np.flatnonzero((chave_b[1:] != chave_b[:-1]) | (chave_r[1:] != chave_r[:-1])) + 1
+        i, j = _pares_dos_baldes(ordem, quebra)
+        codigos.append(np.minimum(i, j) * n + np.maximum(i, j))
+    if ignorados:
+        print(f"⚠️ {ignorados} baldes com mais de {MAX_BALDE} nomes ignorados")
+    codigos = np.unique(np.concatenate(codigos)) if codigos else np.empty(0, dtype=np.int64)
+    return np.stack((codigos // max(n, 1), codigos % max(n, 1)), axis=1)
+
+
+def _estimativa(sigs, pares, lote=200_000):
+    """Fração de permutações iguais = estimativa do Jaccard"""
+    saida = np.empty(len(pares))
+    for inicio in range(0, len(pares), lote):
+        p = pares[inicio:inicio + lote]
+        saida[inicio:inicio + lote] = (sigs[p[:, 0]] == sigs[p[:, 1]]).mean(axis=1)
+    return saida
+
+
+def _raiz(pais, i):
+    while pais[i] != i:
+        pais[i] = pais[pais[i]]
+        i = pais[i]
+    return i
+
+
+def detectar(produtos, limiar=LIMIAR, bandas=BANDAS):
+    """Lista de clusters: {'ids', 'nomes', 'peso', 'score_min', 'score_max'}"""
+    # Um item por nome normalizado; produtos que normalizam igual entram juntos
+    itens = []
+    por_chave = {}
+    for p in produtos:
+        if not p.get('nome'):
+            continue
+        chave = normalizar(p['nome'])
+        if not chave[0]:
+            continue
+        if chave not in por_chave:
+            por_chave[chave] = len(itens)
+            itens.append({'texto': chave[0], 'bloco': chave[1], 'shingles': shingles(chave[0]), 'produtos': []})
+        itens[por_chave[chave]]['produtos'].append((p['id'], p['nome']))
+
+    ids_bloco = {}
+    blocos = np.fromiter((ids_bloco.setdefault(it['bloco'], len(ids_bloco)) for it in itens),
+                         dtype=np.uint64, count=len(itens))
+    sigs = assinaturas([it['texto'] for it in itens])
+    pares = candidatos(blocos, sigs, bandas)
+    provaveis = pares[_estimativa(sigs, pares) >= limiar - FOLGA_ESTIMATIVA]
+
+    pais = list(range(len(itens)))
+    scores = []
+    for i, j in provaveis.tolist():
+        score = jaccard(itens[i]['shingles'], itens[j]['shingles'])
+        if score < limiar:
+            continue
+        scores.append((i, score))
+        ri, rj = _raiz(pais, i), _raiz(pais, j)
+        if ri != rj:
+            pais[rj] = ri
+    print(f"🔗 {sum(len(it['produtos']) for it in itens)} produtos | {len(itens)} nomes normalizados | "
+          f"{len(pares)} pares candidatos | {len(scores)} acima do limiar {limiar}")
+
+    membros = defaultdict(list)
+    pontuacao = defaultdict(list)
+    for i, item in enumerate(itens):
+        raiz = _raiz(pais, i)
+        membros[raiz].append(i)
+        if len(item['produtos']) > 1:
+            pontuacao[raiz].append(1.0)
+    for i, score in scores:
+        pontuacao[_raiz(pais, i)].append(score)
+
+    clusters = []
+    for raiz, indices in membros.items():
+        produtos_cluster = [p for i in indices for p in itens[i]['produtos']]
+        if len(produtos_cluster) < 2:
+            continue
+        s = pontuacao[raiz]
+        clusters.append({
+            'ids': [id_ for id_, _ in produtos_cluster],
+            'nomes': [nome for _, nome in produtos_cluster],
+            'peso': itens[raiz]['bloco'][0],
+            'score_min': round(min(s), 3),
+            'score_max': round(max(s), 3),
+        })
+    clusters.sort(key=lambda c: (-len(c['ids']), -c['score_min']))
+    return clusters
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Detecta produtos quase duplicados")
+    argumento_snapshot(parser)
+    parser.add_argument("--limiar", type=float, default=LIMIAR, help="Jaccard mínimo (0-1)")
+    parser.add_argument("--saida", help="Grava os clusters em JSON")
+    parser.add_argument("--mostrar", type=int, default=20)
+    args = parser.parse_args()
+
+    t0 = time.time()
+    print("... Buscando produtos ...")
+    clusters = detectar(fonte("produtos", "id,nome", args.snapshot), args.limiar)
+    print(f"🧩 {len(clusters)} clusters de quase-duplicatas ({time.time() - t0:.1f}s)")
+    print("-" * 60)
+    for c in clusters[:args.mostrar]:
+        print(f"[{c['peso']}] score {c['score_min']:.2f}-{c['score_max']:.2f}")
+        for id_, nome in zip(c['ids'], c['nomes']):
+            print(f"   {id_:>6}  {nome}")
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(clusters, f, ensure_ascii=False, indent=2)
+        print(f"💾 Clusters salvos em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Configuração das lojas usadas pelos scrapers (URLs e seletores)
+Compartilhada entre a busca no navegador e a busca HTTP rápida
+"""
+import re
+
+# URLs de busca das lojas
+LOJAS = {
+    "Petz": "https://www.petz.com.br/busca?q={termo}",
+    "Cobasi": "https://www.cobasi.com.br/busca?q={termo}",
+    "Petlove": "https://www.petlove.com.br/busca?q={termo}",
+    "ML": "https://lista.mercadolivre.com.br/{termo}",
+}
+
+# Card de resultado de busca
+SELETOR_CARD = {
+    "ML": "li.ui-search-layout__item",
+}
+SELETOR_CARD_PADRAO = "[class*='ProductCard'], [class*='product-card'], article"
+
+# Candidatos testados em ordem dentro do card (ordem padrão; cada loja reordena e
+# poda pela telemetria de seletores.py)
+SELETORES_NOME = ['h2', 'h3', '[class*="name"]', '[class*="title"]', '.ui-search-item__title']
+SELETORES_PRECO = ['[class*="price"]', '[class*="Price"]', '[class*="valor"]']
+SELETOR_PRECO_ML = "span.andes-money-amount__fraction"
+SELETOR_CENTAVOS_ML = "span.andes-money-amount__cents"
+
+# Quantos cards do topo da busca são lidos (o primeiro completo é usado)
+TOP_K_CARDS = 5
+
+
+def seletor_card(loja):
+    return SELETOR_CARD.get(loja, SELETOR_CARD_PADRAO)
+
+
+def listas_seletores(seletores=None):
+    """(nomes, precos) a testar: a ordem da telemetria da loja ({'nome', 'preco'}) ou a padrão"""
+    seletores = seletores or {}
+    return seletores.get('nome', SELETORES_NOME), seletores.get('preco', SELETORES_PRECO)
+
+
+def listas_reduzidas(nomes, precos):
+    """True se a telemetria podou ou reordenou os candidatos (vale repetir com a lista padrão)"""
+    return list(nomes) != SELETORES_NOME or list(precos) != SELETORES_PRECO
+
+
+def montar_url(loja, termo):
+    """Monta a URL de busca da loja para o termo"""
+    if loja == "ML":
+        return f"https://lista.mercadolivre.com.br/{termo.replace(' ', '-')}"
+    return LOJAS[loja].format(termo=termo.replace(' ', '%20'))
+
+
+def extrair_preco(texto):
+    if not texto:
+        return None
+    texto = texto.replace("A partir de", "").strip()
+    match = re.search(r'R\$\s*(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))', texto)
+    if match:
+        preco_str = match.group(1).replace('.', '').replace(',', '.')
+        try:
+            preco = float(preco_str)
+            return preco if preco > 5 else None
+        except:
+            pass
+    # Só número (ML)
+    match = re.search(r'(\d{1,3}(?:\.\d{3})*,\d{2})', texto)
+    if match:
+        preco_str = match.group(1).replace('.', '').replace(',', '.')
+        try:
+            preco = float(preco_str)
+            return preco if preco > 5 else None
+        except:
+            pass
+    # Número sem vírgula (ML - só a parte inteira)
+    match = re.search(r'^(\d+)$', texto.strip())
+    if match:
+        try:
+            return float(match.group(1))
+        except:
+            pass
+    return None
+
+
+def montar_resultado(loja, card):
+    """Converte um card bruto em resultado (ou None se faltar nome/preço).
+
+    O card vem do extrator JS do navegador ou do parser HTTP, no formato:
+    {'nome', 'seletor_nome', 'precos': [textos na ordem dos seletores de preço],
+     'seletores_precos': [seletor de cada texto], 'fracao', 'centavos',
+     'imagem': {'src', 'data-src', 'data-lazy-src'}, 'link'}
+    O resultado leva em 'seletores' quais seletores deram o nome e o preço
+    (telemetria em seletores.py).
+    """
+    nome = (card.get('nome') or '').strip()[:150]
+    if not nome:
+        return None
+
+    preco = None
+    seletor_preco = None
+    if loja == "ML":
+        fracao = (card.get('fracao') or '').strip().replace('.', '')
+        if fracao.isdigit():
+            preco = float(fracao)
+            seletor_preco = SELETOR_PRECO_ML
+            centavos = (card.get('centavos') or '').strip()
+            if centavos.isdigit():
+                preco = round(preco + int(centavos) / 100, 2)
+    else:
+        precos = card.get('precos') or []
+        seletores = card.get('seletores_precos') or [None] * len(precos)
+        for texto, seletor in zip(precos, seletores):
+            preco = extrair_preco(texto)
+            if preco:
+                seletor_preco = seletor
+                break
+    if not preco:
+        return None
+
+    imagem = None
+    img = card.get('imagem')
+    if img:
+        imagem = img.get('src')
+        # Se for data:image ou muito pequena, tenta data-src
+        if not imagem or 'data:image' in imagem or len(imagem) < 20:
+            imagem = img.get('data-src') or img.get('data-lazy-src')
+
+    return {'nome': nome, 'preco': preco, 'imagem': imagem, 'link': card.get('link'), 'loja': loja,
+            'seletores': {'nome': card.get('seletor_nome'), 'preco': seletor_preco}}
+
+
+def escolher_resultado(loja, cards):
+    """Primeiro card completo (nome + preço) entre os do topo da busca"""
+    for card in cards[:TOP_K_CARDS]:
+        resultado = montar_resultado(loja, card)
+        if resultado:
+            return resultado
+    return None
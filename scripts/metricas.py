@@ -0,0 +1,184 @@
+"""
+Métricas do scraper: contadores, medidores e histogramas com rótulos
+Cada processo tem o seu registro (METRICAS). Os workers mandam o que mediram
+junto com cada resultado (retirar() -> mesclar() no coordenador), que grava:
+
+- JSONL: uma linha {"tipo": "metricas", ...} por intervalo com os valores
+  acumulados e uma linha {"tipo": "busca", ...} por busca (trace simples)
+- Prometheus textfile (.prom): sobrescrito a cada intervalo, para o
+  node_exporter --collector.textfile
+
+    python scripts/scrape_from_csv.py --metricas scripts/metricas_scraper.jsonl
+    python scripts/scrape_from_csv.py --metricas /var/lib/node_exporter/scraper.prom
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# Limites (s) dos baldes dos histogramas de latência
+BALDES = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25)
+INTERVALO_GRAVACAO = 15  # segundos
+
+
+def _chave(nome, rotulos):
+    return nome, tuple(sorted(rotulos.items()))
+
+
+class Metricas:
+    """Registro em memória; os valores são acumulados desde a criação (ou o último retirar)"""
+
+    def __init__(self):
+        self.contadores = {}
+        self.medidores = {}
+        self.histogramas = {}  # chave -> [contagem por balde..., +Inf, soma]
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        chave = _chave(nome, rotulos)
+        self.contadores[chave] = self.contadores.get(chave, 0) + valor
+
+    def definir(self, nome, valor, **rotulos):
+        self.medidores[_chave(nome, rotulos)] = valor
+
+    def observar(self, nome, valor, **rotulos):
+        chave = _chave(nome, rotulos)
+        h = self.histogramas.get(chave)
+        if h is None:
+            h = self.histogramas[chave] = [0] * (len(BALDES) + 2)
+        for i, limite in enumerate(BALDES):
+            if valor <= limite:
+                h[i] += 1
+                break
+        else:
+            h[len(BALDES)] += 1
+        h[-1] += valor
+
+    @contextmanager
+    def cronometro(self, nome, **rotulos):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nome, time.perf_counter() - t0, **rotulos)
+
+    def retirar(self):
+        """Devolve (e zera) o que foi medido, em formato serializável para a fila"""
+        dados = {
+            'contadores': [[n, list(r), v] for (n, r), v in self.contadores.items()],
+            'medidores': [[n, list(r), v] for (n, r), v in self.medidores.items()],
+            'histogramas': [[n, list(r), h] for (n, r), h in self.histogramas.items()],
+        }
+        self.contadores, self.medidores, self.histogramas = {}, {}, {}
+        return dados
+
+    def mesclar(self, dados):
+        """Soma ao registro o que veio de retirar() de outro processo"""
+        for nome, rotulos, valor in dados.get('contadores', []):
+            chave = (nome, tuple(map(tuple, rotulos)))
+            self.contadores[chave] = self.contadores.get(chave, 0) + valor
+        for nome, rotulos, valor in dados.get('medidores', []):
+            self.medidores[(nome, tuple(map(tuple, rotulos)))] = valor
+        for nome, rotulos, h in dados.get('histogramas', []):
+            chave = (nome, tuple(map(tuple, rotulos)))
+            atual = self.histogramas.get(chave)
+            if atual is None:
+                self.histogramas[chave] = list(h)
+            else:
+                self.histogramas[chave] = [a + b for a, b in zip(atual, h)]
+
+    def media(self, nome, **rotulos):
+        """(soma, n) de um histograma"""
+        h = self.histogramas.get(_chave(nome, rotulos))
+        return (h[-1], sum(h[:-1])) if h else (0.0, 0)
+
+    def series(self, nome):
+        """Rótulos (dict) das séries de um histograma"""
+        return [dict(r) for (n, r) in self.histogramas if n == nome]
+
+    def valor(self, nome, **rotulos):
+        return self.contadores.get(_chave(nome, rotulos), 0)
+
+    # --- Saída ---
+
+    def como_dict(self):
+        historicos = []
+        for (nome, rotulos), h in self.histogramas.items():
+            historicos.append({'nome': nome, 'rotulos': dict(rotulos), 'soma': round(h[-1], 6),
+                               'n': sum(h[:-1]), 'baldes': dict(zip(map(str, BALDES + ('+Inf',)), h[:-1]))})
+        return {
+            'contadores': [{'nome': n, 'rotulos': dict(r), 'valor': v} for (n, r), v in self.contadores.items()],
+            'medidores': [{'nome': n, 'rotulos': dict(r), 'valor': v} for (n, r), v in self.medidores.items()],
+            'histogramas': historicos,
+        }
+
+    def prometheus(self):
+        """Texto no formato de exposição do Prometheus"""
+        linhas = []
+        tipos = {}
+
+        def fmt(rotulos, extra=()):
+            pares = list(rotulos) + list(extra)
+            if not pares:
+                return ""
+            return "{" + ",".join(f'{k}="{str(v).replace(chr(34), "")}"' for k, v in pares) + "}"
+
+        def cabecalho(nome, tipo):
+            if nome not in tipos:
+                tipos[nome] = tipo
+                linhas.append(f"# TYPE {nome} {tipo}")
+
+        for (nome, rotulos), v in sorted(self.contadores.items()):
+            cabecalho(nome, "counter")
+            linhas.append(f"{nome}{fmt(rotulos)} {v}")
+        for (nome, rotulos), v in sorted(self.medidores.items()):
+            cabecalho(nome, "gauge")
+            linhas.append(f"{nome}{fmt(rotulos)} {v}")
+        for (nome, rotulos), h in sorted(self.histogramas.items()):
+            cabecalho(nome, "histogram")
+            acumulado = 0
+            for limite, n in zip(BALDES + ("+Inf",), h[:-1]):
+                acumulado += n
+                linhas.append(f"{nome}_bucket{fmt(rotulos, [('le', limite)])} {acumulado}")
+            linhas.append(f"{nome}_sum{fmt(rotulos)} {h[-1]:.6f}")
+            linhas.append(f"{nome}_count{fmt(rotulos)} {acumulado}")
+        return "\n".join(linhas) + "\n"
+
+
+class GravadorMetricas:
+    """Grava o registro a cada `intervalo` s em JSONL ou Prometheus textfile (.prom)"""
+
+    def __init__(self, metricas, caminho, intervalo=INTERVALO_GRAVACAO):
+        self.metricas = metricas
+        self.caminho = caminho
+        self.prometheus = caminho.endswith(".prom")
+        self.intervalo = intervalo
+        self.ultima = time.time()
+        self._eventos = []
+
+    def evento(self, tipo, **dados):
+        """Linha de trace (só no JSONL)"""
+        if not self.prometheus:
+            self._eventos.append({'tipo': tipo, 'ts': round(time.time(), 3), **dados})
+
+    def talvez_gravar(self):
+        if time.time() - self.ultima >= self.intervalo:
+            self.gravar()
+
+    def gravar(self):
+        self.ultima = time.time()
+        if self.prometheus:
+            temporario = self.caminho + ".tmp"
+            with open(temporario, 'w', encoding='utf-8') as f:
+                f.write(self.metricas.prometheus())
+            # Troca atômica: o node_exporter nunca lê arquivo pela metade
+            os.replace(temporario, self.caminho)
+            return
+        eventos, self._eventos = self._eventos, []
+        with open(self.caminho, 'a', encoding='utf-8') as f:
+            for e in eventos:
+                f.write(json.dumps(e, ensure_ascii=False) + "\n")
+            f.write(json.dumps({'tipo': 'metricas', 'ts': round(self.ultima, 3), **self.metricas.como_dict()},
+                               ensure_ascii=False) + "\n")
+
+
+METRICAS = Metricas()
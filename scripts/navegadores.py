@@ -0,0 +1,274 @@
+"""
+Pool de navegadores de um worker: Chrome ativo + reserva pré-aquecida
+- Antes de cada busca o ativo passa por um health check (um execute_script);
+  se o Chrome caiu ou travou a sessão, é descartado e a reserva assume.
+- Reciclagem: depois de PAGINAS_MAX páginas ou RSS_MAX_MB de memória (Chrome
+  + filhos, medido com psutil se estiver instalado) o ativo é trocado pela
+  reserva e fechado em segundo plano.
+- A reserva é criada numa thread enquanto o ativo trabalha, então nenhuma
+  busca espera o uc.Chrome frio (só a primeira, se não houver aquecimento).
+- Abas: o worker pode carregar várias buscas no mesmo Chrome (uma por aba),
+  o que rende bem mais buscas por GB de RAM do que mais processos.
+A criação é serializada entre processos por uma trava (o patch do
+chromedriver do undetected_chromedriver não gosta de criações simultâneas).
+
+Perfil "enxuto": bloqueia via CDP (Network.setBlockedURLs) os bytes de
+imagens, fontes, mídia e domínios de analytics/anúncios. Os atributos
+src/data-src dos <img> continuam no DOM, que é só o que o extrator lê.
+Comparação com o perfil completo: scripts/benchmark_perfil.py
+"""
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from metricas import METRICAS
+
+PAGINAS_MAX = 300
+RSS_MAX_MB = 1500
+# Páginas entre medições de memória (psutil percorre a árvore de processos)
+VERIFICAR_RSS_A_CADA = 25
+# Espera (s) antes de tentar criar de novo depois de uma falha
+ESPERA_FALHA_CRIACAO = 5
+
+PERFIS = ("enxuto", "completo")
+# Padrões do Network.setBlockedURLs ('*' casa qualquer trecho; o '*' final cobre a query string)
+BLOQUEIOS_ENXUTO = [
+    # Imagens, fontes e mídia
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*", "*.svg*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+    "*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*",
+    # Analytics, anúncios e rastreadores
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*googleadservices.com*", "*facebook.net*",
+    "*hotjar.com*", "*clarity.ms*", "*analytics.tiktok.com*", "*bat.bing.com*",
+    "*criteo.com*", "*criteo.net*", "*taboola.com*", "*outbrain.com*",
+    "*nr-data.net*", "*newrelic.com*", "*cdn.segment.com*", "*api.segment.io*",
+    "*sentry.io*", "*onesignal.com*", "*useinsider.com*", "*rtbhouse.com*",
+]
+
+
+def aplicar_perfil(driver, perfil):
+    """Configura o bloqueio de recursos do perfil na aba atual (vale para as próximas navegações)"""
+    if perfil not in PERFIS:
+        raise ValueError(f"Perfil desconhecido: {perfil} (use {', '.join(PERFIS)})")
+    if perfil == "enxuto":
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOQUEIOS_ENXUTO})
+
+
+def rss_mb(driver):
+    """Memória (MB) do chromedriver, do Chrome e dos processos filhos; None sem psutil"""
+    if psutil is None:
+        return None
+    pids = {getattr(getattr(driver, 'service', None), 'process', None)}
+    pids = {p.pid for p in pids if p is not None}
+    if getattr(driver, 'browser_pid', None):
+        pids.add(driver.browser_pid)
+    total = 0
+    vistos = set()
+    for pid in pids:
+        try:
+            raiz = psutil.Process(pid)
+            for proc in [raiz] + raiz.children(recursive=True):
+                if proc.pid not in vistos:
+                    vistos.add(proc.pid)
+                    total += proc.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / 1024 / 1024 if vistos else None
+
+
+def vivo(driver):
+    try:
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+
+def fechar_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class PoolNavegadores:
+    """Um Chrome ativo por worker e, opcionalmente, um reserva aquecido"""
+
+    def __init__(self, criar, loja, nome=None, trava=None, reserva=True,
+                 paginas_max=PAGINAS_MAX, rss_max_mb=RSS_MAX_MB):
+        self.criar = criar
+        self.loja = loja
+        self.nome = nome or loja
+        self.trava = trava
+        self.reserva = reserva
+        self.paginas_max = paginas_max
+        self.rss_max_mb = rss_max_mb
+        self.ativo = None
+        self.paginas = 0
+        self._reserva = None
+        self._aquecendo = None
+        self._falhou_em = 0
+
+    def _criar(self):
+        if self.trava is not None:
+            with self.trava:
+                driver = self.criar()
+        else:
+            driver = self.criar()
+        METRICAS.incrementar("scraper_navegadores_abertos_total", loja=self.loja)
+        return driver
+
+    def _aquecer(self):
+        try:
+            self._reserva = self._criar()
+        except Exception as e:
+            METRICAS.incrementar("scraper_erros_total", loja=self.loja, tipo=type(e).__name__)
+            self._reserva = None
+            self._falhou_em = time.time()
+
+    def aquecer(self):
+        """Começa a criar a reserva em segundo plano (se ainda não houver)"""
+        if not self.reserva or self._reserva is not None:
+            return
+        if self._aquecendo is not None and self._aquecendo.is_alive():
+            return
+        if time.time() - self._falhou_em < ESPERA_FALHA_CRIACAO:
+            return
+        self._aquecendo = threading.Thread(target=self._aquecer, daemon=True)
+        self._aquecendo.start()
+
+    def _pegar_reserva(self):
+        """Reserva pronta (espera a criação em andamento) ou None"""
+        if self._aquecendo is not None:
+            self._aquecendo.join()
+            self._aquecendo = None
+        driver, self._reserva = self._reserva, None
+        if driver is not None and not vivo(driver):
+            fechar_driver(driver)
+            driver = None
+        return driver
+
+    def descartar(self, motivo):
+        velho, self.ativo = self.ativo, None
+        self.paginas = 0
+        METRICAS.incrementar("scraper_navegadores_descartados_total", loja=self.loja, motivo=motivo)
+        # quit() leva segundos; a busca seguinte não precisa esperar
+        threading.Thread(target=fechar_driver, args=(velho,), daemon=True).start()
+
+    def precisa_reciclar(self):
+        if self.paginas >= self.paginas_max:
+            return "paginas"
+        if self.paginas and self.paginas % VERIFICAR_RSS_A_CADA == 0:
+            mb = rss_mb(self.ativo)
+            if mb is not None:
+                METRICAS.definir("scraper_navegador_rss_mb", round(mb, 1), worker=self.nome)
+                if mb >= self.rss_max_mb:
+                    return "memoria"
+        return None
+
+    def quer_trocar(self):
+        """Motivo para trocar o ativo agora ("queda", "paginas", "memoria") ou None"""
+        if self.ativo is None:
+            return None
+        return "queda" if not vivo(self.ativo) else self.precisa_reciclar()
+
+    def registrar_pagina(self):
+        self.paginas += 1
+
+    def obter(self, tempos=None, contar=True):
+        """Driver pronto para a próxima busca (saudável e dentro dos limites).
+        Se precisar esperar a criação de um Chrome, registra tempos['abrir_navegador'].
+        Com contar=False a página não é contada (quem usa abas conta cada navegação)."""
+        motivo = self.quer_trocar()
+        if motivo:
+            print(f"♻️ [{self.nome}] Trocando navegador ({motivo}, {self.paginas} páginas)")
+            self.descartar(motivo)
+        if self.ativo is None:
+            t0 = time.perf_counter()
+            self.ativo = self._pegar_reserva() or self._criar()
+            espera = time.perf_counter() - t0
+            if tempos is not None and espera > 0.05:
+                tempos['abrir_navegador'] = espera
+        self.aquecer()
+        if contar:
+            self.paginas += 1
+        return self.ativo
+
+    def fechar(self):
+        if self._aquecendo is not None:
+            self._aquecendo.join(timeout=30)
+        for driver in (self.ativo, self._reserva):
+            if driver is not None:
+                fechar_driver(driver)
+        self.ativo = self._reserva = None
+
+
+class Abas:
+    """K abas no mesmo Chrome, navegadas sem esperar o carregamento.
+
+    Precisa de page_load_strategy "none": com "eager" o chromedriver segura
+    qualquer comando na aba até o DOMContentLoaded. Antes de navegar, a aba
+    marca o documento atual (window.__abaVelha); como cada documento novo tem
+    outro objeto window, a marca some quando a página nova entra e o card da
+    busca anterior nunca é confundido com o da atual.
+    """
+
+    def __init__(self, driver, k, perfil):
+        self.driver = driver
+        self.handles = [driver.current_window_handle]
+        for _ in range(k - 1):
+            driver.switch_to.new_window('tab')
+            # O bloqueio do perfil vale por aba (alvo CDP)
+            aplicar_perfil(driver, perfil)
+            self.handles.append(driver.current_window_handle)
+        self.atual = self.handles[-1]
+        self.livres = list(self.handles)
+        self.ocupadas = {}  # handle -> tarefa
+
+    def ir(self, handle):
+        if handle != self.atual:
+            self.driver.switch_to.window(handle)
+            self.atual = handle
+
+    def navegar(self, url, tarefa):
+        """Começa a carregar `url` numa aba livre e volta na hora"""
+        handle = self.livres[-1]
+        self.ir(handle)
+        self.driver.execute_script("window.__abaVelha = true; window.location.href = arguments[0];", url)
+        self.ocupadas[self.livres.pop()] = tarefa
+        return handle
+
+    def tem(self, handle, seletor):
+        """A página nova da aba já tem `seletor`? (False enquanto carrega)"""
+        self.ir(handle)
+        try:
+            return bool(self.driver.execute_script(
+                "return !window.__abaVelha && document.querySelector(arguments[0]) !== null;", seletor))
+        except Exception:
+            if not self.navegador_vivo():
+                raise
+            return False
+
+    def liberar(self, handle, parar=False):
+        tarefa = self.ocupadas.pop(handle)
+        self.livres.append(handle)
+        if parar:
+            try:
+                self.ir(handle)
+                self.driver.execute_script("window.stop();")
+            except Exception:
+                pass
+        return tarefa
+
+    def navegador_vivo(self):
+        """O processo do Chrome responde? (não depende da página da aba atual)"""
+        try:
+            self.driver.window_handles
+            return True
+        except Exception:
+            return False
@@ -0,0 +1,134 @@
+"""
+Paridade e benchmark: agrupamento.py x src/lib/agrupamento.ts
+(definir_grupo x definirGrupo e extrair_peso_para_botao x extrairPesoParaBotao)
+Monta um corpus com os nomes do produtos_pets_200.csv (com e sem peso), os
+nomes reais do banco/snapshot e variações de caixa/espaços, roda as duas
+implementações, mostra as divergências e a vazão em nomes/s.
+
+    python scripts/paridade_agrupamento.py                 # CSV + variações
+    python scripts/paridade_agrupamento.py --snapshot      # + nomes do snapshot
+    python scripts/paridade_agrupamento.py --supabase      # + nomes do Supabase
+    python scripts/paridade_agrupamento.py --sem-ts        # só o benchmark Python
+
+O lado TS roda com Node (npx tsx scripts/definir-grupo-lote.ts).
+Sai com código 1 se houver divergência.
+"""
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import time
+
+from agrupamento import agrupar, definir_grupo, extrair_peso_para_botao
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARQUIVO_CSV = os.path.join(RAIZ, "produtos_pets_200.csv")
+HELPER_TS = os.path.join("scripts", "definir-grupo-lote.ts")
+REPETICOES = 5
+
+
+def nomes_csv(caminho=ARQUIVO_CSV):
+    nomes = []
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            nomes.append(row['nome'])
+            if row.get('peso_variacao'):
+                nomes.append(f"{row['nome']} {row['peso_variacao']}")
+    return nomes
+
+
+def variacoes(nomes):
+    """Casos de borda das regras: caixa, espaços (inclusive nbsp), pacotes e nomes curtos"""
+    extras = []
+    for nome in nomes:
+        extras.append(nome.upper())
+        extras.append("  " + nome.replace(" ", "  ") + " ")
+        extras.append(nome.replace(" ", "\u00a0"))
+        extras.append(nome + " c/3")
+        extras.append(nome + " Cx 3 Tabletes")
+    extras += ["", "Kit 2kg", "Coleira Média", "Bravecto 250mg", "NexGard 4,1 a 10kg", "Antipulgas 10.10 a 20.0kg", "Osso 500g", "Petisco 80gr", "Cat 1kg", "Gatos 7+ 1,5kg", "cãespecial golden"]
+    return extras
+
+
+def montar_corpus(snapshot=None, supabase=False):
+    nomes = nomes_csv()
+    if snapshot or supabase:
+        from snapshot import fonte
+        nomes += [p['nome'] for p in fonte("produtos", "id,nome", snapshot) if p.get('nome')]
+    nomes += variacoes(nomes)
+    # Sem repetidos, na ordem de chegada
+    return list(dict.fromkeys(nomes))
+
+
+def benchmark_python(nomes, repeticoes=REPETICOES):
+    """(nomes/s sem cache, nomes/s com cache quente)"""
+    frio = 0.0
+    for _ in range(repeticoes):
+        definir_grupo.cache_clear()
+        t0 = time.perf_counter()
+        agrupar(nomes)
+        frio += time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(repeticoes):
+        agrupar(nomes)
+    quente = time.perf_counter() - t0
+    return len(nomes) * repeticoes / frio, len(nomes) * repeticoes / quente
+
+
+def rodar_ts(nomes, repeticoes=REPETICOES):
+    """Roda o helper TS; retorna (grupos, pesos, segundos por passada)"""
+    entrada = json.dumps({"nomes": nomes, "repeticoes": repeticoes}, ensure_ascii=False)
+    comando = "npx tsx " + HELPER_TS
+    proc = subprocess.run(comando, input=entrada.encode('utf-8'), capture_output=True,
+                          cwd=RAIZ, shell=True)
+    if proc.returncode != 0:
+        sys.exit(f"❌ Falha ao rodar {comando}:\n{proc.stderr.decode('utf-8', 'replace')[-2000:]}")
+    saida = json.loads(proc.stdout.decode('utf-8'))
+    return saida['grupos'], saida['pesos'], saida['segundos']
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Paridade/benchmark do agrupamento Python x TS")
+    parser.add_argument("--snapshot", nargs="?", const=True, default=None, metavar="ARQUIVO",
+                        help="Inclui os nomes do snapshot local")
+    parser.add_argument("--supabase", action="store_true", help="Inclui os nomes do Supabase")
+    parser.add_argument("--sem-ts", action="store_true", help="Não roda o TS (só benchmark Python)")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--mostrar", type=int, default=30, help="Divergências exibidas")
+    args = parser.parse_args()
+
+    snapshot = args.snapshot
+    if snapshot is True:
+        from snapshot import ARQUIVO_SNAPSHOT
+        snapshot = ARQUIVO_SNAPSHOT
+    nomes = montar_corpus(snapshot, args.supabase)
+    print(f"📋 Corpus: {len(nomes)} nomes distintos")
+
+    frio, quente = benchmark_python(nomes, args.repeticoes)
+    print(f"🐍 Python: {frio:,.0f} nomes/s (sem cache) | {quente:,.0f} nomes/s (cache quente)")
+
+    if args.sem_ts:
+        return
+
+    grupos_ts, pesos_ts, segundos = rodar_ts(nomes, args.repeticoes)
+    print(f"🟦 TS:     {len(nomes) / segundos:,.0f} nomes/s")
+
+    grupos_py = agrupar(nomes)
+    pesos_py = [extrair_peso_para_botao(n) for n in nomes]
+    divergencias = [(n, "grupo", py, ts) for n, py, ts in zip(nomes, grupos_py, grupos_ts) if py != ts]
+    divergencias += [(n, "peso", py, ts) for n, py, ts in zip(nomes, pesos_py, pesos_ts) if py != ts]
+    print("-" * 60)
+    if not divergencias:
+        print(f"✅ Paridade: {len(nomes)} nomes com o mesmo grupo e peso")
+        return
+    print(f"❌ {len(divergencias)} divergências de {len(nomes)} nomes:")
+    for nome, campo, py, ts in divergencias[:args.mostrar]:
+        print(f"   {nome!r} ({campo})\n      py: {py!r}\n      ts: {ts!r}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+Lista de produtos do CSV (produtos_pets_200.csv) com o termo de busca
+Sem dependências do navegador: usada pelo scraper e pelo planejador.
+"""
+import csv
+import os
+import re
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "produtos_pets_200.csv")
+
+
+def carregar_csv(caminho=CSV_PATH):
+    produtos = []
+    with open(caminho, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            # Limpa termo
+            termo = re.sub(r'[^\w\s]', ' ', row['nome'])
+            termo = ' '.join(termo.split())
+            row['termo'] = termo
+            produtos.append(row)
+    return produtos
@@ -0,0 +1,143 @@
+"""
+Planejador de atualização incremental de preços
+Ordena os pares (produto, loja) por quão velho está o preço e quanto ele
+costuma variar, para gastar o tempo de navegador só onde o preço
+provavelmente mudou.
+
+    score = idade_horas * (1 + PESO_VOLATILIDADE * volatilidade)
+
+volatilidade = (máx - mín) / média dos preços observados do par (precos +
+historico_precos). Pares que nunca foram raspados vêm primeiro; pares sem
+preço que já foram tentados (checkpoint "sem_preco") contam a idade desde
+a última tentativa, para não ocupar o topo em toda rodada.
+
+Uso (só mostra o plano):
+    python scripts/refresh_planner.py --top 50
+No scraper:
+    python scripts/scrape_from_csv.py --refresh --top 200
+    python scripts/scrape_from_csv.py --refresh --orcamento-min 30
+"""
+import argparse
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from lojas import LOJAS
+from supabase_rest import varrer
+
+PESO_VOLATILIDADE = 5
+# Estimativa de segundos por busca quando não há medição (HTTP + Chrome, média)
+SEGUNDOS_POR_BUSCA = 4.0
+
+
+def _parse_data(valor):
+    """Data do banco em UTC; sem fuso é hora local (gravada pelo scraper com datetime.now())"""
+    data = datetime.fromisoformat(valor.replace('Z', '+00:00'))
+    return data.astimezone(timezone.utc)
+
+
+def estatisticas_pares(incluir_historico=True):
+    """(produto_id, loja) -> {'ultima': datetime, 'precos': [valores observados]}"""
+    pares = defaultdict(lambda: {'ultima': None, 'precos': []})
+    for row in varrer("precos", "id,produto_id,loja,preco,ultima_atualizacao"):
+        if row['loja'] not in LOJAS:
+            continue
+        par = pares[(row['produto_id'], row['loja'])]
+        par['precos'].append(float(row['preco']))
+        if row.get('ultima_atualizacao'):
+            data = _parse_data(row['ultima_atualizacao'])
+            if par['ultima'] is None or data > par['ultima']:
+                par['ultima'] = data
+    if incluir_historico:
+        try:
+            for row in varrer("historico_precos", "id,produto_id,loja,preco"):
+                if (row['produto_id'], row['loja']) in pares:
+                    pares[(row['produto_id'], row['loja'])]['precos'].append(float(row['preco']))
+        except Exception as e:
+            print(f"⚠️ historico_precos indisponível ({e}); volatilidade só pelos precos")
+    return pares
+
+
+def volatilidade(precos):
+    if len(precos) < 2:
+        return 0.0
+    media = sum(precos) / len(precos)
+    return (max(precos) - min(precos)) / media if media > 0 else 0.0
+
+
+def ranquear(produtos_csv, indice, pares, tentativas=None, agora=None):
+    """Lista [(score, codigo, loja, idade_h, vol)] do mais urgente ao menos.
+    idade_h = None quando o par nunca foi raspado nem tentado (vai para o topo).
+    `tentativas`: (codigo, loja) -> datetime com fuso da última tentativa (checkpoint)."""
+    agora = agora or datetime.now(timezone.utc)
+    tentativas = tentativas or {}
+    ranking = []
+    for p in produtos_csv:
+        codigo = p['codigo']
+        produto_id = (indice.get(codigo) or {}).get('id')
+        for loja in LOJAS:
+            par = pares.get((produto_id, loja)) if produto_id is not None else None
+            if not par or par['ultima'] is None:
+                tentativa = tentativas.get((codigo, loja))
+                if tentativa is None:
+                    ranking.append((float('inf'), codigo, loja, None, 0.0))
+                else:
+                    idade_h = max((agora - tentativa.astimezone(timezone.utc)).total_seconds() / 3600, 0.0)
+                    ranking.append((idade_h, codigo, loja, idade_h, 0.0))
+                continue
+            idade_h = max((agora - par['ultima']).total_seconds() / 3600, 0.0)
+            vol = volatilidade(par['precos'])
+            ranking.append((idade_h * (1 + PESO_VOLATILIDADE * vol), codigo, loja, idade_h, vol))
+    ranking.sort(key=lambda x: x[0], reverse=True)
+    return ranking
+
+
+def planejar(ranking, top=None, orcamento_min=None, workers_por_loja=None,
+             segundos_por_busca=SEGUNDOS_POR_BUSCA):
+    """Escolhe os pares a raspar: os `top` primeiros e/ou o que couber no
+    orçamento de tempo (cada loja roda em paralelo com seus workers)."""
+    workers_por_loja = workers_por_loja or {}
+    escolhidos = set()
+    gasto = defaultdict(float)  # segundos de parede estimados por loja
+    for score, codigo, loja, _, _ in ranking:
+        if top is not None and len(escolhidos) >= top:
+            break
+        if orcamento_min is not None:
+            custo = segundos_por_busca / workers_por_loja.get(loja, 1)
+            if gasto[loja] + custo > orcamento_min * 60:
+                continue
+            gasto[loja] += custo
+        escolhidos.add((codigo, loja))
+    return escolhidos
+
+
+def plano_refresh(produtos_csv, indice, top=None, orcamento_min=None, workers_por_loja=None,
+                  tentativas=None):
+    """Atalho usado pelo scrape_from_csv: baixa estatísticas, ranqueia e planeja"""
+    ranking = ranquear(produtos_csv, indice or {}, estatisticas_pares(), tentativas)
+    return planejar(ranking, top, orcamento_min, workers_por_loja)
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    from produtos_csv import carregar_csv
+    from supabase_writer import carregar_indice
+    from scrape_checkpoint import Checkpoint
+
+    parser = argparse.ArgumentParser(description="Mostra o plano de atualização incremental")
+    parser.add_argument("--top", type=int, default=50)
+    args = parser.parse_args()
+
+    produtos_csv = carregar_csv()
+    ranking = ranquear(produtos_csv, carregar_indice() or {}, estatisticas_pares(),
+                       Checkpoint().ultimas_tentativas())
+    nunca = sum(1 for r in ranking if r[3] is None)
+    print(f"📋 {len(ranking)} pares (produto, loja) | {nunca} nunca raspados")
+    print("-" * 60)
+    for score, codigo, loja, idade_h, vol in ranking[:args.top]:
+        idade = "nunca" if idade_h is None else f"{idade_h:.1f}h"
+        print(f"{codigo:<10} {loja:<8} idade {idade:>8} | volat. {vol:.2f} | score {score:.1f}")
+
+
+if __name__ == "__main__":
+    main()
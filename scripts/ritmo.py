@@ -0,0 +1,200 @@
+"""
+Ritmo por loja: limite de requisições (balde de tokens) e backoff em bloqueio
+Todas as requisições de uma loja (HTTP e Chrome, de todos os workers dela)
+pegam um token de um balde compartilhado entre processos: RITMO_PADRAO
+buscas/s com rajadas de até RAJADA. Ritmo constante rende mais do que
+rajadas que fazem a loja bloquear o IP por uma hora.
+
+Bloqueio detectado (uma das requisições da loja):
+    http_403/http_429  status da página (HTTP puro ou navegação do Chrome)
+    captcha            marcadores de captcha/desafio anti-robô na página
+    queda_acertos      os acertos recentes do worker despencaram (páginas
+                       vazias ou sem resultado no lugar do captcha)
+
+A loja inteira pausa por BACKOFF_BASE s (dobrando a cada bloqueio seguido,
+até BACKOFF_MAX) e o ritmo cai pela metade; cada produto achado depois
+zera o nível e devolve aos poucos o ritmo configurado. A partir de
+NIVEL_ROTACAO bloqueios seguidos o worker troca de Chrome (perfil novo,
+sem cookies) e de sessão HTTP.
+"""
+import random
+import time
+from collections import deque
+from multiprocessing import Lock, Value
+
+# Buscas por segundo por loja (somando os workers) e tamanho máximo da rajada
+RITMO_PADRAO = 1.0
+RAJADA = 3
+# O ritmo não cai abaixo desta fração do configurado
+FRACAO_MINIMA = 0.1
+# Fração do ritmo configurado recuperada a cada produto achado
+AUMENTO = 0.02
+# Pausa (s) no primeiro bloqueio; dobra a cada bloqueio seguido
+BACKOFF_BASE = 15
+BACKOFF_MAX = 600
+# Bloqueios seguidos para trocar de Chrome e de sessão HTTP
+NIVEL_ROTACAO = 2
+
+STATUS_BLOQUEIO = (403, 429)
+# Trechos (minúsculos) de HTML, URL ou texto de páginas de desafio/captcha
+MARCADORES_CAPTCHA = (
+    "captcha-delivery.com",        # DataDome
+    "px-captcha",                  # PerimeterX
+    "g-recaptcha", "h-captcha",
+    "challenges.cloudflare.com", "challenge-platform",
+    "account-verification",        # Mercado Livre
+    "não sou um robô", "verifique se você é humano",
+    "are you a robot", "verify you are human",
+    "acesso negado", "access denied",
+)
+
+# Queda de acertos: taxa das últimas JANELA_ACERTOS buscas abaixo de
+# QUEDA_ACERTOS x a taxa do worker na execução (que precisa ser ao menos TAXA_MIN_QUEDA)
+JANELA_ACERTOS = 20
+MIN_BUSCAS_QUEDA = 40
+QUEDA_ACERTOS = 0.3
+TAXA_MIN_QUEDA = 0.3
+
+# Status da navegação (0 se ainda não há resposta), elemento de captcha e textos da página
+JS_BLOQUEIO = """
+const nav = performance.getEntriesByType('navigation')[0];
+const quadros = Array.from(document.querySelectorAll('iframe')).map(f => f.src || '').join(' ');
+const texto = document.body ? (document.body.innerText || '').slice(0, 3000) : '';
+return [nav && nav.responseStatus || 0,
+        document.querySelector('#px-captcha, .g-recaptcha, .h-captcha, #challenge-form') !== null,
+        [location.href, document.title, quadros, texto].join(' ')];
+"""
+
+
+class Bloqueio(Exception):
+    """A loja bloqueou a requisição; `motivo` como em motivo_bloqueio"""
+
+    def __init__(self, motivo):
+        super().__init__(motivo)
+        self.motivo = motivo
+
+
+class SemVez(Exception):
+    """A vez da loja (token/pausa) só chegaria depois do prazo do produto"""
+
+
+def motivo_bloqueio(status=None, texto="", captcha=False):
+    """"http_<status>", "captcha" ou None"""
+    if status in STATUS_BLOQUEIO:
+        return f"http_{status}"
+    texto = texto.lower()
+    if captcha or any(marcador in texto for marcador in MARCADORES_CAPTCHA):
+        return "captcha"
+    return None
+
+
+def bloqueio_na_pagina(driver):
+    """Motivo do bloqueio da página da aba atual do Chrome (ou None).
+    O status vem do PerformanceNavigationTiming, sem ligar o log de performance."""
+    try:
+        status, captcha, texto = driver.execute_script(JS_BLOQUEIO)
+    except Exception:
+        return None
+    return motivo_bloqueio(status, texto or "", captcha)
+
+
+class RitmoLoja:
+    """Balde de tokens e backoff de uma loja, compartilhados pelos workers dela.
+    Criado no coordenador e passado aos processos (trava e valores em memória compartilhada)."""
+
+    def __init__(self, loja, taxa=RITMO_PADRAO, rajada=RAJADA):
+        self.loja = loja
+        self.taxa_max = taxa
+        self.rajada = max(1, rajada)
+        self._trava = Lock()
+        self._taxa = Value('d', taxa, lock=False)
+        self._tokens = Value('d', self.rajada, lock=False)
+        self._atualizado = Value('d', time.time(), lock=False)
+        self._pausa_ate = Value('d', 0.0, lock=False)
+        self._bloqueado_em = Value('d', 0.0, lock=False)
+        self._nivel = Value('i', 0, lock=False)
+
+    @property
+    def taxa(self):
+        return self._taxa.value
+
+    def _vez(self):
+        """Consome um token se houver; senão, segundos até o próximo"""
+        with self._trava:
+            agora = time.time()
+            pausa = self._pausa_ate.value - agora
+            if pausa <= 0:
+                decorrido = max(0.0, agora - self._atualizado.value)
+                self._tokens.value = min(self.rajada, self._tokens.value + decorrido * self._taxa.value)
+                self._atualizado.value = agora
+                if self._tokens.value >= 1:
+                    self._tokens.value -= 1
+                    return 0.0
+            # Durante a pausa o balde fica vazio e só volta a encher quando ela acaba
+            return max(0.0, pausa) + (1 - self._tokens.value) / self._taxa.value
+
+    def tentar(self, ate=None):
+        """Pega a vez sem esperar (True/False); SemVez se ela só viria depois de `ate`"""
+        espera = self._vez()
+        if espera and ate is not None and time.time() + espera > ate:
+            raise SemVez()
+        return not espera
+
+    def esperar(self, ate=None):
+        """Espera a vez da loja e retorna o horário da requisição (time.time()).
+        SemVez se ela só viria depois de `ate`."""
+        while True:
+            espera = self._vez()
+            if not espera:
+                return time.time()
+            if ate is not None and time.time() + espera > ate:
+                raise SemVez()
+            time.sleep(min(espera, 1.0))
+
+    def bloqueio(self, pedido):
+        """Bloqueio visto numa requisição feita em `pedido`: pausa a loja.
+        Retorna (nível, pausa em s), ou None se a requisição é de antes da
+        última pausa (a mesma onda de bloqueio, já tratada por outra busca)."""
+        with self._trava:
+            if pedido is None or pedido < self._bloqueado_em.value:
+                return None
+            agora = time.time()
+            nivel = self._nivel.value = self._nivel.value + 1
+            # Jitter para os workers (e as lojas) não voltarem todos no mesmo instante
+            pausa = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (nivel - 1)) * random.uniform(1, 1.25)
+            self._taxa.value = max(FRACAO_MINIMA * self.taxa_max, self._taxa.value / 2)
+            self._bloqueado_em.value = agora
+            self._pausa_ate.value = self._atualizado.value = agora + pausa
+            self._tokens.value = 0.0
+        return nivel, pausa
+
+    def sucesso(self, pedido):
+        """Produto achado numa requisição feita em `pedido`: zera o nível e recupera parte do ritmo"""
+        with self._trava:
+            if pedido is None or pedido < self._bloqueado_em.value:
+                return
+            self._nivel.value = 0
+            self._taxa.value = min(self.taxa_max, self._taxa.value + AUMENTO * self.taxa_max)
+
+
+class QuedaAcertos:
+    """Acertos recentes x acertos da execução, em um worker"""
+
+    def __init__(self, janela=JANELA_ACERTOS):
+        self.recentes = deque(maxlen=janela)
+        self.buscas = 0
+        self.acertos = 0
+
+    def registrar(self, achou):
+        """True quando os acertos recentes despencam (a janela recomeça vazia)"""
+        achou = bool(achou)
+        self.recentes.append(achou)
+        self.buscas += 1
+        self.acertos += achou
+        if len(self.recentes) < self.recentes.maxlen or self.buscas < MIN_BUSCAS_QUEDA:
+            return False
+        taxa = self.acertos / self.buscas
+        if taxa < TAXA_MIN_QUEDA or sum(self.recentes) / len(self.recentes) >= QUEDA_ACERTOS * taxa:
+            return False
+        self.recentes.clear()
+        return True
@@ -0,0 +1,78 @@
+"""
+Diário de progresso do scraper (JSONL, só acrescenta linhas)
+Cada tentativa (codigo, loja) é registrada com resultado e horário, para que
+`scrape_from_csv.py --resume` pule o que já foi feito recentemente.
+
+Status:
+    ok         preço gravado no Supabase (registrado pelo escritor após o lote)
+    sem_preco  a loja respondeu sem resultado
+    prazo      a loja não respondeu (ou não teve a vez no ritmo) dentro do prazo
+               (refeito no --resume)
+    bloqueio   a loja bloqueou a busca (captcha, 403/429; refeito no --resume)
+"""
+import json
+import os
+from datetime import datetime, timedelta
+
+ARQUIVO_CHECKPOINT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scrape_checkpoint.jsonl")
+# Status que contam como concluídos no --resume
+STATUS_CONCLUIDOS = {"ok", "sem_preco"}
+
+
+def _quando(reg):
+    """Horário do registro com fuso (registros antigos, sem fuso, são hora local)"""
+    return datetime.fromisoformat(reg['quando']).astimezone()
+
+
+class Checkpoint:
+    def __init__(self, caminho=ARQUIVO_CHECKPOINT):
+        self.caminho = caminho
+        self._arquivo = None
+
+    def _ultimos(self):
+        """Último registro de cada par (codigo, loja)"""
+        ultimos = {}
+        if not os.path.exists(self.caminho):
+            return ultimos
+        with open(self.caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    reg = json.loads(linha)
+                except ValueError:
+                    continue  # linha cortada por queda no meio da escrita
+                ultimos[(reg['codigo'], reg['loja'])] = reg
+        return ultimos
+
+    def ultimas_tentativas(self):
+        """(codigo, loja) -> datetime da última tentativa concluída"""
+        return {par: _quando(reg)
+                for par, reg in self._ultimos().items() if reg['status'] in STATUS_CONCLUIDOS}
+
+    def carregar_concluidos(self, frescor_horas):
+        """Pares (codigo, loja) concluídos nas últimas `frescor_horas` horas.
+        Vale a última tentativa de cada par."""
+        ultimos = self._ultimos()
+        limite = datetime.now().astimezone() - timedelta(hours=frescor_horas)
+        return {par for par, reg in ultimos.items()
+                if reg['status'] in STATUS_CONCLUIDOS
+                and _quando(reg) >= limite}
+
+    def registrar(self, codigo, loja, status, preco=None):
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+        reg = {"codigo": codigo, "loja": loja, "status": status, "quando": datetime.now().astimezone().isoformat()}
+        if preco is not None:
+            reg["preco"] = preco
+        self._arquivo.write(json.dumps(reg, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+
+    def registrar_gravados(self, itens):
+        """Callback do EscritorSupabase: (produto_csv, resultados) já gravados"""
+        for produto_csv, resultados in itens:
+            for r in resultados:
+                self.registrar(produto_csv['codigo'], r['loja'], "ok", r['preco'])
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
@@ -0,0 +1,181 @@
+"""
+Telemetria dos seletores de nome/preço por loja
+Cada busca com resultado registra qual seletor de SELETORES_NOME deu o nome e
+qual de SELETORES_PRECO deu o preço (o ML usa a fração). Com isso, nas
+próximas execuções, cada loja testa os seletores na ordem dos que mais
+acertam e deixa de testar os que nunca acertaram (poda). Se a lista podada
+não completar nenhum card, o worker repete a extração com a lista padrão
+inteira, e o acerto de um seletor podado o traz de volta.
+
+Alertas (seletor prestes a quebrar):
+    perdendo    a média móvel de acertos caiu abaixo de QUEDA x a taxa histórica
+    parado      acertava, mas não acerta há DIAS_SEM_ACERTO dias com a loja ativa
+
+    python scripts/seletores.py                 # ordem atual e alertas por loja
+    python scripts/seletores.py --zerar Petz    # esquece a telemetria da loja
+"""
+import sys
+import argparse
+import json
+import os
+import time
+
+from lojas import LOJAS, SELETORES_NOME, SELETORES_PRECO
+
+ARQUIVO_SELETORES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "seletores_stats.json")
+PADRAO = {'nome': SELETORES_NOME, 'preco': SELETORES_PRECO}
+# Buscas registradas antes de podar um seletor que nunca acertou
+MIN_OBS = 30
+# Peso da busca mais recente na média móvel de acertos (~50 buscas)
+ALFA = 0.02
+# Alerta quando a média móvel cai abaixo desta fração da taxa histórica
+QUEDA = 0.5
+# Só alerta sobre seletores que já acertaram isto (em vezes e em taxa)
+MIN_VITORIAS = 10
+TAXA_MINIMA = 0.2
+DIAS_SEM_ACERTO = 14
+
+
+def carregar(caminho=ARQUIVO_SELETORES):
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def recente(s):
+    """Média móvel de acertos corrigida pelo início em zero"""
+    return s['ema'] / (1 - (1 - ALFA) ** s['vistos']) if s['vistos'] else 0.0
+
+
+def salvar(stats, caminho=ARQUIVO_SELETORES):
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, ensure_ascii=False, indent=1)
+    os.replace(temporario, caminho)
+
+
+class TelemetriaSeletores:
+    """stats[loja][tipo] = {'buscas', 'ultima_busca', 'seletores': {seletor: {...}}}
+    com {'vistos', 'vitorias', 'ema', 'ultima_vitoria'} por seletor"""
+
+    def __init__(self, caminho=ARQUIVO_SELETORES):
+        self.caminho = caminho
+        self.stats = carregar(caminho)
+
+    def _tipo(self, loja, tipo):
+        return self.stats.setdefault(loja, {}).setdefault(
+            tipo, {'buscas': 0, 'ultima_busca': None, 'seletores': {}})
+
+    def registrar(self, loja, vencedores, agora=None):
+        """Registra uma busca com resultado: vencedores = {'nome': seletor, 'preco': seletor}"""
+        agora = agora or time.time()
+        for tipo, candidatos in PADRAO.items():
+            vencedor = (vencedores or {}).get(tipo)
+            dados = self._tipo(loja, tipo)
+            dados['buscas'] += 1
+            dados['ultima_busca'] = agora
+            seletores = dados['seletores']
+            for seletor in candidatos:
+                seletores.setdefault(seletor, {'vistos': 0, 'vitorias': 0, 'ema': 0.0, 'ultima_vitoria': None})
+            for seletor, s in seletores.items():
+                if seletor not in candidatos:
+                    continue
+                venceu = seletor == vencedor
+                s['vistos'] += 1
+                s['ema'] = round((1 - ALFA) * s['ema'] + ALFA * venceu, 6)
+                if venceu:
+                    s['vitorias'] += 1
+                    s['ultima_vitoria'] = agora
+
+    def ordem(self, loja, tipo):
+        """Candidatos da loja: mais acertos primeiro, sem os que nunca acertaram
+        em MIN_OBS buscas. Sem telemetria suficiente, a ordem padrão."""
+        candidatos = PADRAO[tipo]
+        seletores = self.stats.get(loja, {}).get(tipo, {}).get('seletores', {})
+        mantidos = []
+        for i, seletor in enumerate(candidatos):
+            s = seletores.get(seletor)
+            if s and s['vistos'] >= MIN_OBS and s['vitorias'] == 0:
+                continue
+            # Seletor novo (sem telemetria) fica na posição padrão, depois dos que acertam
+            mantidos.append((-(s['vitorias'] / s['vistos']) if s and s['vistos'] else 0, i, seletor))
+        return [seletor for _, _, seletor in sorted(mantidos)]
+
+    def ordens(self, loja):
+        return {tipo: self.ordem(loja, tipo) for tipo in PADRAO}
+
+    def alertas(self, agora=None):
+        """[(loja, tipo, seletor, motivo)] dos seletores que parecem estar quebrando"""
+        agora = agora or time.time()
+        achados = []
+        for loja, tipos in self.stats.items():
+            for tipo, dados in tipos.items():
+                for seletor, s in dados['seletores'].items():
+                    if s['vitorias'] < MIN_VITORIAS or seletor not in PADRAO.get(tipo, ()):
+                        continue
+                    taxa = s['vitorias'] / s['vistos']
+                    if taxa < TAXA_MINIMA:
+                        continue
+                    if recente(s) < QUEDA * taxa:
+                        achados.append((loja, tipo, seletor,
+                                        f"perdendo: {recente(s):.0%} recente x {taxa:.0%} histórico"))
+                    elif (dados['ultima_busca'] - s['ultima_vitoria']) > DIAS_SEM_ACERTO * 86400 \
+                            and agora - dados['ultima_busca'] < DIAS_SEM_ACERTO * 86400:
+                        dias = (dados['ultima_busca'] - s['ultima_vitoria']) / 86400
+                        achados.append((loja, tipo, seletor, f"parado: sem acerto há {dias:.0f} dias"))
+        return achados
+
+    def zerar(self, loja):
+        self.stats.pop(loja, None)
+
+    def salvar(self):
+        salvar(self.stats, self.caminho)
+
+
+def mostrar_alertas(telemetria):
+    alertas = telemetria.alertas()
+    if not alertas:
+        return
+    print("\n⚠️ Seletores que podem estar quebrando:")
+    for loja, tipo, seletor, motivo in alertas:
+        print(f"   {loja} ({tipo}) {seletor}: {motivo}")
+
+
+def relatorio(telemetria):
+    for loja in LOJAS:
+        tipos = telemetria.stats.get(loja)
+        if not tipos:
+            print(f"\n🏪 {loja}: sem telemetria (ordem padrão)")
+            continue
+        print(f"\n🏪 {loja}")
+        for tipo, candidatos in PADRAO.items():
+            dados = tipos.get(tipo, {'buscas': 0, 'seletores': {}})
+            ordem = telemetria.ordem(loja, tipo)
+            print(f"   {tipo} ({dados['buscas']} buscas): {' > '.join(ordem)}")
+            for seletor in candidatos:
+                s = dados['seletores'].get(seletor)
+                if not s:
+                    continue
+                podado = "" if seletor in ordem else "  (podado)"
+                print(f"      {seletor}: {s['vitorias']}/{s['vistos']} acertos, "
+                      f"recente {recente(s):.0%}{podado}")
+    mostrar_alertas(telemetria)
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Telemetria dos seletores por loja")
+    parser.add_argument("--zerar", metavar="LOJA", help="Apaga a telemetria da loja")
+    parser.add_argument("--arquivo", default=ARQUIVO_SELETORES)
+    args = parser.parse_args()
+    telemetria = TelemetriaSeletores(args.arquivo)
+    if args.zerar:
+        telemetria.zerar(args.zerar)
+        telemetria.salvar()
+        print(f"🧹 Telemetria de {args.zerar} apagada")
+    else:
+        relatorio(telemetria)
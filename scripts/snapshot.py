@@ -0,0 +1,193 @@
+"""
+Snapshot local (SQLite) de produtos, precos e historico_precos
+Para as auditorias rodarem offline em vez de baixar o catálogo a cada vez.
+
+    python scripts/snapshot.py              # exporta / atualiza scripts/snapshot.db
+    python scripts/snapshot.py --completo   # refaz tudo do zero
+
+Depois:
+    python scripts/list_duplicates.py --snapshot
+    python scripts/check_data_quality.py --snapshot
+
+Atualização incremental:
+- precos: linhas com ultima_atualizacao >= a mais recente do snapshot
+- historico_precos: só acrescenta (id > maior id do snapshot)
+- produtos: relido inteiro (não tem data de alteração; é a tabela pequena)
+- precos/historico_precos que apontam para produtos que sumiram (mesclados
+  pelo mesclar_produtos) são relidos pelo id: voltam com o produto_id novo
+  ou saem do snapshot se a mescla os apagou
+Outras linhas de precos apagadas no banco só saem do snapshot com --completo.
+Cada tabela é gravada numa transação: exportação que falha não apaga nada.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+
+from supabase_rest import varrer
+
+ARQUIVO_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshot.db")
+LOTE_INSERT = 1000
+# Ids por filtro in.() ao reler linhas órfãs
+LOTE_IDS = 150
+TABELAS = ("produtos", "precos", "historico_precos")
+
+
+def abrir(caminho=ARQUIVO_SNAPSHOT):
+    con = sqlite3.connect(caminho)
+    con.execute("CREATE TABLE IF NOT EXISTS _snapshot (tabela TEXT PRIMARY KEY, atualizado_em REAL, linhas INTEGER)")
+    return con
+
+
+def _colunas(con, tabela):
+    return [r[1] for r in con.execute(f'PRAGMA table_info("{tabela}")')]
+
+
+def _garantir_colunas(con, tabela, chaves):
+    """Cria a tabela / colunas novas conforme as chaves que chegam do REST"""
+    existentes = _colunas(con, tabela)
+    if not existentes:
+        outras = [c for c in chaves if c != 'id']
+        definicao = ", ".join(['"id" INTEGER PRIMARY KEY'] + [f'"{c}"' for c in outras])
+        con.execute(f'CREATE TABLE "{tabela}" ({definicao})')
+        if 'produto_id' in outras:
+            con.execute(f'CREATE INDEX "idx_{tabela}_produto" ON "{tabela}"(produto_id)')
+        return
+    for c in chaves:
+        if c not in existentes:
+            con.execute(f'ALTER TABLE "{tabela}" ADD COLUMN "{c}"')
+
+
+def _valor(v):
+    return json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v
+
+
+def _gravar(con, tabela, rows):
+    if not rows:
+        return
+    chaves = list(dict.fromkeys(k for r in rows for k in r))
+    _garantir_colunas(con, tabela, chaves)
+    nomes = ", ".join(f'"{c}"' for c in chaves)
+    marcas = ", ".join("?" for _ in chaves)
+    con.executemany(f'INSERT OR REPLACE INTO "{tabela}" ({nomes}) VALUES ({marcas})',
+                    [[_valor(r.get(c)) for c in chaves] for r in rows])
+
+
+def _orfaos(con, tabela):
+    """Ids das linhas cujo produto_id não está mais em produtos (produto mesclado)"""
+    if "produto_id" not in _colunas(con, tabela) or not _colunas(con, "produtos"):
+        return []
+    return [r[0] for r in con.execute(
+        f'SELECT id FROM "{tabela}" WHERE produto_id NOT IN (SELECT id FROM produtos)')]
+
+
+def _exportar(con, tabela, filtros=None, recriar=False, reler=()):
+    """Varre a tabela (com filtros incrementais) e relê as linhas `reler` pelo
+    id, tudo numa transação só"""
+    consultas = [filtros] + [{"id": f"in.({','.join(map(str, reler[i:i + LOTE_IDS]))})"}
+                             for i in range(0, len(reler), LOTE_IDS)]
+    n = 0
+    with con:
+        # O sqlite3 não abre transação antes de DDL: sem o BEGIN o DROP valeria
+        # mesmo se a exportação falhasse no meio
+        con.execute("BEGIN")
+        if recriar:
+            con.execute(f'DROP TABLE IF EXISTS "{tabela}"')
+        if reler:
+            con.executemany(f'DELETE FROM "{tabela}" WHERE id = ?', [(i,) for i in reler])
+        lote = []
+        for consulta in consultas:
+            for row in varrer(tabela, "*", consulta):
+                lote.append(row)
+                if len(lote) >= LOTE_INSERT:
+                    _gravar(con, tabela, lote)
+                    n += len(lote)
+                    lote = []
+        _gravar(con, tabela, lote)
+        n += len(lote)
+        total = con.execute(f'SELECT COUNT(*) FROM "{tabela}"').fetchone()[0] if _colunas(con, tabela) else 0
+        con.execute("INSERT OR REPLACE INTO _snapshot VALUES (?, ?, ?)", (tabela, time.time(), total))
+    return n, total
+
+
+def exportar(caminho=ARQUIVO_SNAPSHOT, completo=False):
+    con = abrir(caminho)
+    for tabela in TABELAS:
+        t0 = time.time()
+        existe = bool(_colunas(con, tabela))
+        filtros = None
+        reler = []
+        if existe and not completo:
+            if tabela == "precos" and "ultima_atualizacao" in _colunas(con, tabela):
+                ultima = con.execute("SELECT MAX(ultima_atualizacao) FROM precos").fetchone()[0]
+                if ultima:
+                    filtros = {"ultima_atualizacao": f"gte.{ultima}"}
+            elif tabela == "historico_precos":
+                maior = con.execute("SELECT MAX(id) FROM historico_precos").fetchone()[0]
+                if maior is not None:
+                    filtros = {"id": f"gt.{maior}"}
+            if filtros:
+                # produtos já foi relido (vem antes em TABELAS)
+                reler = _orfaos(con, tabela)
+        # Sem filtro incremental a tabela é relida inteira
+        n, total = _exportar(con, tabela, filtros, recriar=filtros is None, reler=reler)
+        modo = "incremental" if filtros else "completa"
+        relidas = f", {len(reler)} órfãs relidas" if reler else ""
+        print(f"📦 {tabela}: {n} linhas baixadas ({modo}{relidas}), {total} no snapshot "
+              f"({time.time() - t0:.1f}s)")
+    con.close()
+
+
+def ler(tabela, select="*", caminho=ARQUIVO_SNAPSHOT):
+    """Gera as linhas (dicts) de uma tabela do snapshot, em ordem de id"""
+    if not os.path.exists(caminho):
+        sys.exit(f"❌ Snapshot {caminho} não existe. Rode: python scripts/snapshot.py")
+    con = abrir(caminho)
+    existentes = _colunas(con, tabela)
+    if not existentes:
+        sys.exit(f"❌ Snapshot sem a tabela {tabela}. Rode: python scripts/snapshot.py")
+    pedidas = existentes if select == "*" else [c.strip() for c in select.split(",")]
+    faltando = [c for c in pedidas if c not in existentes]
+    if faltando:
+        sys.exit(f"❌ Colunas {faltando} não estão no snapshot de {tabela}")
+    nomes = ", ".join(f'"{c}"' for c in pedidas)
+    cur = con.execute(f'SELECT {nomes} FROM "{tabela}" ORDER BY id')
+    for row in cur:
+        yield dict(zip(pedidas, row))
+    con.close()
+
+
+def produtos_com_precos(caminho=ARQUIVO_SNAPSHOT):
+    """Equivalente local de produtos?select=*,precos(*)"""
+    por_produto = defaultdict(list)
+    for preco in ler("precos", caminho=caminho):
+        por_produto[preco['produto_id']].append(preco)
+    for p in ler("produtos", caminho=caminho):
+        p['precos'] = por_produto.get(p['id'], [])
+        yield p
+
+
+def fonte(tabela, select, snapshot=None, filtros=None):
+    """Linhas para as auditorias: do snapshot (se informado) ou do Supabase.
+    `filtros` só vale para o Supabase; no snapshot o script filtra em Python."""
+    if snapshot:
+        return ler(tabela, select, snapshot)
+    return varrer(tabela, select, filtros)
+
+
+def argumento_snapshot(parser):
+    """Adiciona --snapshot [arquivo] ao argparse de um script de auditoria"""
+    parser.add_argument("--snapshot", nargs="?", const=ARQUIVO_SNAPSHOT, default=None, metavar="ARQUIVO",
+                        help="Lê do snapshot local em vez do Supabase (padrão: scripts/snapshot.db)")
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Exporta produtos/precos/historico para SQLite local")
+    parser.add_argument("--arquivo", default=ARQUIVO_SNAPSHOT)
+    parser.add_argument("--completo", action="store_true", help="Refaz o snapshot do zero")
+    args = parser.parse_args()
+    exportar(args.arquivo, args.completo)
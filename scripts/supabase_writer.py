@@ -0,0 +1,282 @@
+"""
+Escritor em lote do scraper para o Supabase
+Acumula produtos/preços e grava a cada N produtos ou T segundos:
+- ids dos produtos existentes vêm do índice carregado no início (carregar_indice)
+- 1 POST (upsert on_conflict=codigo_unico) com os produtos novos
+- 1 POST (upsert on_conflict=produto_id,loja) com os preços do lote: precos
+  fica com 1 linha por produto/loja
+- 1 POST em historico_precos só com os preços que mudaram (ou são novos)
+Falhas definitivas vão para um arquivo JSONL (dead-letter) que pode ser reenviado:
+    python scripts/supabase_writer.py --reenviar
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from metricas import METRICAS
+from supabase_rest import SupabaseErro, supabase_request, varrer
+
+LOTE_PRODUTOS = 20
+INTERVALO_FLUSH = 10  # segundos
+ARQUIVO_FALHAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "falhas_supabase.jsonl")
+
+
+def primeira_imagem(resultados):
+    """Primeira imagem válida entre os resultados das lojas"""
+    for r in resultados:
+        if r.get('imagem') and 'data:image' not in r['imagem']:
+            return r['imagem']
+    return None
+
+
+def carregar_indice():
+    """Baixa codigo_unico -> {id, imagem_url} de todos os produtos (paginado).
+    Retorna None se o Supabase não responder (o escritor volta a consultar por lote)."""
+    indice = {}
+    try:
+        for row in varrer("produtos", "id,codigo_unico,imagem_url", {"codigo_unico": "not.is.null"}):
+            indice[row['codigo_unico']] = {'id': row['id'], 'imagem_url': row.get('imagem_url')}
+    except SupabaseErro as e:
+        print(f"⚠️ Índice de produtos indisponível ({e}); consultando por lote")
+        return None
+    return indice
+
+
+def _lista_in(valores):
+    """Filtro in.(...) do PostgREST com valores entre aspas"""
+    return "in.(" + ",".join('"' + str(v).replace('"', '') + '"' for v in valores) + ")"
+
+
+class EscritorSupabase:
+    """Buffer de gravações do scraper.
+
+    salvar() só enfileira; a gravação acontece em descarregar(), chamado
+    automaticamente a cada `lote` produtos ou `intervalo` segundos
+    (talvez_descarregar no loop principal) e no fechar().
+    """
+
+    def __init__(self, lote=LOTE_PRODUTOS, intervalo=INTERVALO_FLUSH, arquivo_falhas=ARQUIVO_FALHAS,
+                 indice=None, ao_gravar=None):
+        # codigo_unico -> {'id', 'imagem_url'}; None = sem índice, consulta a cada lote
+        self.indice = indice
+        # Chamado com [(produto_csv, resultados)] depois que os preços foram gravados
+        self.ao_gravar = ao_gravar
+        self.lote = lote
+        self.intervalo = intervalo
+        self.arquivo_falhas = arquivo_falhas
+        self.pendentes = []  # (produto_csv, resultados)
+        # (produto_id, loja) -> preço atual no banco; preenchido por lote
+        self.precos_atuais = {}
+        self._produtos_com_preco = set()
+        self.ultimo_flush = time.time()
+        self.precos_gravados = 0
+        self.precos_falhos = 0
+
+    def salvar(self, produto_csv, resultados):
+        """Enfileira o produto e seus preços. Retorna quantos preços entraram no lote."""
+        if not resultados:
+            return 0
+        self.pendentes.append((produto_csv, list(resultados)))
+        if len(self.pendentes) >= self.lote:
+            self.descarregar()
+        return len(resultados)
+
+    def talvez_descarregar(self):
+        if self.pendentes and time.time() - self.ultimo_flush >= self.intervalo:
+            self.descarregar()
+
+    def fechar(self):
+        self.descarregar()
+
+    def descarregar(self):
+        lote, self.pendentes = self.pendentes, []
+        self.ultimo_flush = time.time()
+        if not lote:
+            return
+        t0 = time.time()
+        try:
+            with METRICAS.cronometro("scraper_db_segundos", etapa="produtos"):
+                ids = self._garantir_produtos(lote)
+        except SupabaseErro as e:
+            self._registrar_falha("produtos", e, lote)
+            return
+
+        # Com fuso explícito: o banco e o planejador não confundem hora local com UTC
+        agora = datetime.now().astimezone().isoformat()
+        linhas = []
+        sem_id = []
+        for produto_csv, resultados in lote:
+            produto_id = ids.get(produto_csv['codigo'])
+            if produto_id is None:
+                sem_id.append((produto_csv, resultados))
+                continue
+            for r in resultados:
+                linhas.append({
+                    "produto_id": produto_id,
+                    "loja": r['loja'],
+                    "preco": r['preco'],
+                    "link_afiliado": r.get('link'),
+                    "ultima_atualizacao": agora,
+                })
+        if sem_id:
+            self._registrar_falha("produtos", SupabaseErro("produto sem id após upsert"), sem_id)
+
+        gravados = [i for i in lote if i not in sem_id]
+        mudancas = []
+        if linhas:
+            # Mesmo par repetido no lote: fica o último (o upsert não aceita duplicata)
+            linhas = list({(l['produto_id'], l['loja']): l for l in linhas}.values())
+            try:
+                with METRICAS.cronometro("scraper_db_segundos", etapa="precos_atuais"):
+                    self._carregar_precos_atuais({l['produto_id'] for l in linhas})
+            except SupabaseErro as e:
+                print(f"   ⚠️ Preços atuais indisponíveis ({e}); histórico deste lote completo")
+            mudancas = [l for l in linhas
+                        if self.precos_atuais.get((l['produto_id'], l['loja'])) != l['preco']]
+            try:
+                with METRICAS.cronometro("scraper_db_segundos", etapa="precos"):
+                    supabase_request("POST", "precos", linhas, params={"on_conflict": "produto_id,loja"},
+                                     prefer="resolution=merge-duplicates,return=minimal")
+                self.precos_gravados += len(linhas)
+                METRICAS.incrementar("scraper_db_linhas_total", len(linhas), tabela="precos")
+            except SupabaseErro as e:
+                self._registrar_falha("precos", e, gravados)
+                return
+            for l in linhas:
+                self.precos_atuais[(l['produto_id'], l['loja'])] = l['preco']
+            if mudancas:
+                try:
+                    with METRICAS.cronometro("scraper_db_segundos", etapa="historico"):
+                        supabase_request("POST", "historico_precos", [{
+                            "produto_id": l['produto_id'],
+                            "loja": l['loja'],
+                            "preco": l['preco'],
+                            "data_registro": agora,
+                        } for l in mudancas], prefer="return=minimal")
+                    METRICAS.incrementar("scraper_db_linhas_total", len(mudancas), tabela="historico_precos")
+                except SupabaseErro as e:
+                    METRICAS.incrementar("scraper_db_falhas_total", etapa="historico")
+                    # O preço atual já foi gravado; só o ponto de histórico se perde
+                    print(f"   ⚠️ Histórico não gravado ({len(mudancas)} preços): {e}")
+            if self.ao_gravar:
+                self.ao_gravar(gravados)
+        METRICAS.observar("scraper_db_segundos", time.time() - t0, etapa="lote")
+        print(f"   💾 Lote gravado: {len(lote)} produtos, {len(linhas)} preços, "
+              f"{len(mudancas)} mudanças ({time.time() - t0:.1f}s)")
+
+    def _carregar_precos_atuais(self, produto_ids):
+        """Busca de uma vez os preços atuais dos produtos ainda não vistos"""
+        faltando = [i for i in produto_ids if i not in self._produtos_com_preco]
+        if not faltando:
+            return
+        rows = supabase_request("GET", "precos", params={
+            "produto_id": _lista_in(faltando),
+            "select": "produto_id,loja,preco",
+        }) or []
+        for row in rows:
+            self.precos_atuais[(row['produto_id'], row['loja'])] = float(row['preco'])
+        self._produtos_com_preco.update(faltando)
+
+    def _garantir_produtos(self, lote):
+        """Retorna codigo_unico -> id, criando os produtos que faltam e
+        preenchendo a imagem de quem ainda não tem."""
+        por_codigo = {}
+        for produto_csv, resultados in lote:
+            item = por_codigo.setdefault(produto_csv['codigo'], {'csv': produto_csv, 'imagem': None})
+            item['imagem'] = item['imagem'] or primeira_imagem(resultados)
+
+        if self.indice is not None:
+            existentes = {c: self.indice[c] for c in por_codigo if c in self.indice}
+        else:
+            existentes = self._buscar_existentes(por_codigo)
+        ids = {}
+        for codigo, row in existentes.items():
+            ids[codigo] = row['id']
+            imagem = por_codigo[codigo]['imagem']
+            # Atualiza imagem se não tiver
+            if imagem and not row.get('imagem_url'):
+                try:
+                    supabase_request("PATCH", "produtos", {"imagem_url": imagem},
+                                     {"id": f"eq.{row['id']}"}, prefer="return=minimal")
+                    row['imagem_url'] = imagem
+                except SupabaseErro as e:
+                    print(f"   ⚠️ Imagem não atualizada ({codigo}): {e}")
+
+        novos = [{
+            "nome": item['csv']['nome'],
+            "marca": item['csv']['marca'],
+            "categoria": item['csv']['categoria'],
+            "codigo_unico": codigo,
+            "imagem_url": item['imagem'],
+        } for codigo, item in por_codigo.items() if codigo not in ids]
+        if novos:
+            criados = supabase_request(
+                "POST", "produtos", novos, params={"on_conflict": "codigo_unico"},
+                prefer="resolution=ignore-duplicates,return=representation") or []
+            for row in criados:
+                ids[row['codigo_unico']] = row['id']
+                if self.indice is not None:
+                    self.indice[row['codigo_unico']] = {'id': row['id'], 'imagem_url': row.get('imagem_url')}
+            # Criados por outro processo depois do índice (ignore-duplicates não os devolve)
+            faltando = [c for c in por_codigo if c not in ids]
+            if faltando:
+                for codigo, row in self._buscar_existentes(faltando).items():
+                    ids[codigo] = row['id']
+                    if self.indice is not None:
+                        self.indice[codigo] = row
+        return ids
+
+    def _buscar_existentes(self, codigos):
+        rows = supabase_request("GET", "produtos", params={
+            "codigo_unico": _lista_in(codigos),
+            "select": "id,codigo_unico,imagem_url",
+        }) or []
+        return {r['codigo_unico']: {'id': r['id'], 'imagem_url': r.get('imagem_url')} for r in rows}
+
+    def _registrar_falha(self, etapa, erro, itens):
+        """Dead-letter: guarda o que não foi gravado para reenviar depois"""
+        n_precos = sum(len(resultados) for _, resultados in itens)
+        self.precos_falhos += n_precos
+        METRICAS.incrementar("scraper_db_falhas_total", etapa=etapa)
+        print(f"   ❌ Falha ao gravar {etapa} ({len(itens)} produtos): {erro}")
+        with open(self.arquivo_falhas, 'a', encoding='utf-8') as f:
+            for produto_csv, resultados in itens:
+                f.write(json.dumps({
+                    "quando": datetime.now().isoformat(),
+                    "etapa": etapa,
+                    "erro": str(erro),
+                    "produto": produto_csv,
+                    "resultados": resultados,
+                }, ensure_ascii=False) + "\n")
+
+
+def reenviar_falhas(arquivo=ARQUIVO_FALHAS):
+    """Regrava o conteúdo do dead-letter. O que falhar de novo volta para o arquivo."""
+    if not os.path.exists(arquivo):
+        print("✅ Nenhuma falha pendente.")
+        return
+    processando = arquivo + ".reenviando"
+    os.replace(arquivo, processando)
+    escritor = EscritorSupabase(arquivo_falhas=arquivo)
+    total = 0
+    with open(processando, 'r', encoding='utf-8') as f:
+        for linha in f:
+            if linha.strip():
+                item = json.loads(linha)
+                total += escritor.salvar(item['produto'], item['resultados'])
+    escritor.fechar()
+    os.remove(processando)
+    print(f"🔁 Reenviados {total} preços | gravados: {escritor.precos_gravados} | "
+          f"falharam de novo: {escritor.precos_falhos}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Escritor em lote do scraper")
+    parser.add_argument("--reenviar", action="store_true", help=f"Reenvia {os.path.basename(ARQUIVO_FALHAS)}")
+    args = parser.parse_args()
+    if args.reenviar:
+        reenviar_falhas()
+    else:
+        parser.print_help()
@@ -0,0 +1,19 @@
+import remove_duplicates
+
+
+def test_aplicar_usa_a_chave_de_servico_em_todos_os_lotes(monkeypatch):
+    chamadas = []
+
+    def rpc(metodo, caminho, data=None, chave=None):
+        chamadas.append((caminho, chave, len(data['mapa'])))
+        return {'precos_movidos': 1, 'produtos_removidos': len(data['mapa'])}
+
+    monkeypatch.setattr(remove_duplicates, "chave_servico", lambda: "segredo")
+    monkeypatch.setattr(remove_duplicates, "supabase_request", rpc)
+    mapa = [(f"Produto {i}", i, [1000 + i]) for i in range(450)]
+
+    totais = remove_duplicates.aplicar(mapa, lote=200)
+
+    assert [chave for _, chave, _ in chamadas] == ["segredo"] * 3
+    assert [n for _, _, n in chamadas] == [200, 200, 50]
+    assert totais == {'precos_movidos': 3, 'produtos_removidos': 450}
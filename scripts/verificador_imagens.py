@@ -0,0 +1,117 @@
+"""
+Verificador assíncrono de imagens (usado por check_images e fix_images)
+- URLs repetidas são verificadas uma vez só por execução
+- conexões reaproveitadas e no máximo LIMITE_POR_HOST requisições por CDN
+- HEAD primeiro; GET só se o servidor recusar o HEAD
+- cache persistente por URL (cache_imagens.json): dentro do TTL não há
+  requisição; fora dele, revalida com If-None-Match / If-Modified-Since
+
+Requer aiohttp (pip install aiohttp).
+"""
+import asyncio
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+ARQUIVO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_imagens.json")
+TTL_HORAS = 24
+LIMITE_POR_HOST = 6
+LIMITE_TOTAL = 64
+TIMEOUT = 5
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+
+def url_valida_estatica(url):
+    """Checagem sem rede: vazia, 'none', curta demais ou data:image"""
+    url = str(url or '').strip()
+    return bool(url) and url.lower() != 'none' and len(url) >= 20 and 'data:image' not in url
+
+
+def carregar_cache(caminho=ARQUIVO_CACHE):
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def salvar_cache(cache, caminho=ARQUIVO_CACHE):
+    # Grava em arquivo temporário e troca: o cache nunca fica pela metade
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(temporario, caminho)
+
+
+async def _requisitar(session, metodo, url, headers):
+    async with session.request(metodo, url, headers=headers, allow_redirects=True) as r:
+        return r.status, r.headers.get('ETag'), r.headers.get('Last-Modified')
+
+
+async def _verificar(session, url, entrada, semaforos):
+    """Retorna a nova entrada de cache: {status, etag, last_modified, verificado_em}.
+    Erros de rede voltam com status = texto do erro."""
+    headers = dict(HEADERS)
+    if entrada and entrada.get('status') == 200:
+        if entrada.get('etag'):
+            headers['If-None-Match'] = entrada['etag']
+        if entrada.get('last_modified'):
+            headers['If-Modified-Since'] = entrada['last_modified']
+
+    host = urlsplit(url).hostname or ''
+    semaforo = semaforos.setdefault(host, asyncio.Semaphore(LIMITE_POR_HOST))
+    async with semaforo:
+        try:
+            status, etag, modificado = await _requisitar(session, 'HEAD', url, headers)
+            if status not in (200, 304):
+                # Tenta GET se HEAD falhar (alguns CDNs não aceitam HEAD)
+                status, etag, modificado = await _requisitar(session, 'GET', url, HEADERS)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            return {'status': str(e) or type(e).__name__, 'verificado_em': time.time()}
+
+    if status == 304:
+        # Não mudou desde a última verificação: continua válida
+        return dict(entrada, verificado_em=time.time())
+    return {'status': status, 'etag': etag, 'last_modified': modificado, 'verificado_em': time.time()}
+
+
+async def _verificar_todas(urls, cache, ttl_segundos):
+    agora = time.time()
+    a_verificar = [u for u in urls
+                   if u not in cache or agora - cache[u].get('verificado_em', 0) >= ttl_segundos
+                   or not isinstance(cache[u].get('status'), int)]
+    if not a_verificar:
+        return 0
+    conector = aiohttp.TCPConnector(limit=LIMITE_TOTAL, limit_per_host=LIMITE_POR_HOST, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+    semaforos = {}
+    async with aiohttp.ClientSession(connector=conector, timeout=timeout) as session:
+        entradas = await asyncio.gather(*(_verificar(session, u, cache.get(u), semaforos) for u in a_verificar))
+    for url, entrada in zip(a_verificar, entradas):
+        cache[url] = entrada
+    return len(a_verificar)
+
+
+def verificar_urls(urls, ttl_horas=TTL_HORAS, caminho_cache=ARQUIVO_CACHE):
+    """Verifica as URLs e retorna url -> status (200 = ok; int = HTTP; str = erro de rede).
+    URLs inválidas pela checagem estática voltam com status 'invalida' sem requisição."""
+    unicas = set(urls)
+    resultado = {u: 'invalida' for u in unicas if not url_valida_estatica(u)}
+    validas = [u for u in unicas if u not in resultado]
+
+    cache = carregar_cache(caminho_cache)
+    t0 = time.time()
+    verificadas = asyncio.run(_verificar_todas(validas, cache, ttl_horas * 3600)) if validas else 0
+    if verificadas:
+        salvar_cache(cache, caminho_cache)
+    print(f"🌐 {len(unicas)} URLs únicas | {verificadas} verificadas na rede | "
+          f"{len(validas) - verificadas} do cache ({time.time() - t0:.1f}s)")
+
+    for u in validas:
+        resultado[u] = cache[u]['status']
+    return resultado
@@ -23,3 +23,139 @@ CREATE TABLE IF NOT EXISTS alertas_preco (
 
 -- Índice para alertas ativos
 CREATE INDEX IF NOT EXISTS idx_alertas_ativos ON alertas_preco(ativo, produto_id);
+
+-- Scraper: upsert de produtos em lote por codigo_unico (on_conflict=codigo_unico)
+-- O scraper antigo fazia "consulta e insere" sem restrição, então pode haver
+-- produtos repetidos com o mesmo codigo_unico. Antes do índice único, o de
+-- menor id fica com o código e os outros ficam sem (NULL não conflita); os
+-- repetidos têm o mesmo nome e são mesclados depois com
+-- scripts/remove_duplicates.py (precos/histórico passam para o de menor id).
+UPDATE produtos p SET codigo_unico = NULL
+FROM (
+  SELECT id, ROW_NUMBER() OVER (PARTITION BY codigo_unico ORDER BY id) AS ordem
+  FROM produtos
+  WHERE codigo_unico IS NOT NULL
+) repetidos
+WHERE p.id = repetidos.id AND repetidos.ordem > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_produtos_codigo_unico ON produtos(codigo_unico);
+
+-- Scraper: precos guarda só o preço atual (1 linha por produto/loja).
+-- Antes do índice único, as linhas repetidas de execuções anteriores viram
+-- histórico (só quando o preço mudou) e saem da tabela, ficando a mais recente.
+INSERT INTO historico_precos (produto_id, loja, preco, data_registro)
+SELECT produto_id, loja, preco, COALESCE(ultima_atualizacao, NOW())
+FROM (
+  SELECT p.*,
+         LAG(preco) OVER (PARTITION BY produto_id, loja ORDER BY ultima_atualizacao, id) AS preco_anterior
+  FROM precos p
+) serie
+WHERE preco_anterior IS DISTINCT FROM preco
+  AND NOT EXISTS (
+    SELECT 1 FROM historico_precos h
+    WHERE h.produto_id = serie.produto_id AND h.loja = serie.loja
+  );
+
+DELETE FROM precos p
+USING (
+  SELECT id, ROW_NUMBER() OVER (
+    PARTITION BY produto_id, loja ORDER BY ultima_atualizacao DESC NULLS LAST, id DESC
+  ) AS ordem
+  FROM precos
+) duplicados
+WHERE p.id = duplicados.id AND duplicados.ordem > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_precos_produto_loja ON precos(produto_id, loja);
+
+-- Mescla de produtos duplicados (scripts/remove_duplicates.py, via RPC).
+-- mapa: [{"de": id_removido, "para": id_mantido}, ...]. Tudo numa transação:
+-- precos, historico_precos, alertas_preco e avaliacoes passam para o produto
+-- mantido e os duplicados são apagados. Em precos (1 linha por produto/loja)
+-- fica a linha mais recente de cada loja; as demais vão para o histórico.
+CREATE OR REPLACE FUNCTION mesclar_produtos(mapa JSONB)
+RETURNS JSONB AS $$
+DECLARE
+  de_ids BIGINT[];
+  para_ids BIGINT[];
+  n_descartados INTEGER;
+  n_precos INTEGER;
+  n_historico INTEGER;
+  n_alertas INTEGER;
+  n_avaliacoes INTEGER;
+  n_produtos INTEGER;
+BEGIN
+  SELECT array_agg(de), array_agg(para) INTO de_ids, para_ids
+  FROM jsonb_to_recordset(mapa) AS m(de BIGINT, para BIGINT);
+
+  IF de_ids IS NULL THEN
+    RETURN jsonb_build_object('produtos_removidos', 0);
+  END IF;
+  IF EXISTS (SELECT 1 FROM unnest(de_ids, para_ids) AS m(de, para) WHERE de IS NULL OR para IS NULL OR de = para) THEN
+    RAISE EXCEPTION 'mapa inválido: de/para vazio ou igual';
+  END IF;
+  IF (SELECT COUNT(DISTINCT d) FROM unnest(de_ids) AS d) <> array_length(de_ids, 1) THEN
+    RAISE EXCEPTION 'mapa inválido: produto removido mais de uma vez';
+  END IF;
+  IF EXISTS (SELECT 1 FROM unnest(para_ids) AS p WHERE p = ANY(de_ids)) THEN
+    RAISE EXCEPTION 'mapa inválido: produto mantido também está na lista de removidos';
+  END IF;
+  IF EXISTS (SELECT 1 FROM unnest(para_ids) AS p WHERE NOT EXISTS (SELECT 1 FROM produtos WHERE id = p)) THEN
+    RAISE EXCEPTION 'mapa inválido: produto mantido não existe';
+  END IF;
+
+  -- precos: por (produto mantido, loja) fica só a linha mais recente;
+  -- as outras viram histórico do produto mantido
+  WITH descartes AS (
+    DELETE FROM precos p
+    USING (
+      SELECT pr.id, COALESCE(m.para, pr.produto_id) AS destino, ROW_NUMBER() OVER (
+        PARTITION BY COALESCE(m.para, pr.produto_id), pr.loja
+        ORDER BY pr.ultima_atualizacao DESC NULLS LAST, pr.id DESC
+      ) AS ordem
+      FROM precos pr
+      LEFT JOIN unnest(de_ids, para_ids) AS m(de, para) ON m.de = pr.produto_id
+      WHERE pr.produto_id = ANY(de_ids) OR pr.produto_id = ANY(para_ids)
+    ) serie
+    WHERE p.id = serie.id AND serie.ordem > 1
+    RETURNING serie.destino, p.loja, p.preco, p.ultima_atualizacao
+  ), historico AS (
+    INSERT INTO historico_precos (produto_id, loja, preco, data_registro)
+    SELECT destino, loja, preco, COALESCE(ultima_atualizacao, NOW())
+    FROM descartes WHERE preco IS NOT NULL
+  )
+  SELECT COUNT(*) INTO n_descartados FROM descartes;
+
+  UPDATE precos p SET produto_id = m.para
+  FROM unnest(de_ids, para_ids) AS m(de, para) WHERE p.produto_id = m.de;
+  GET DIAGNOSTICS n_precos = ROW_COUNT;
+
+  UPDATE historico_precos h SET produto_id = m.para
+  FROM unnest(de_ids, para_ids) AS m(de, para) WHERE h.produto_id = m.de;
+  GET DIAGNOSTICS n_historico = ROW_COUNT;
+
+  UPDATE alertas_preco a SET produto_id = m.para
+  FROM unnest(de_ids, para_ids) AS m(de, para) WHERE a.produto_id = m.de;
+  GET DIAGNOSTICS n_alertas = ROW_COUNT;
+
+  UPDATE avaliacoes a SET produto_id = m.para
+  FROM unnest(de_ids, para_ids) AS m(de, para) WHERE a.produto_id = m.de;
+  GET DIAGNOSTICS n_avaliacoes = ROW_COUNT;
+
+  DELETE FROM produtos WHERE id = ANY(de_ids);
+  GET DIAGNOSTICS n_produtos = ROW_COUNT;
+
+  RETURN jsonb_build_object(
+    'precos_movidos', n_precos,
+    'precos_descartados', n_descartados,
+    'historico_precos', n_historico,
+    'alertas_preco', n_alertas,
+    'avaliacoes', n_avaliacoes,
+    'produtos_removidos', n_produtos
+  );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Só o service_role mescla: o Postgres deixa PUBLIC executar funções novas e
+-- o Supabase também dá EXECUTE a anon/authenticated (a chave anon é pública)
+REVOKE EXECUTE ON FUNCTION mesclar_produtos(jsonb) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION mesclar_produtos(jsonb) TO service_role;